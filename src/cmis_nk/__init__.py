@@ -1,8 +1,12 @@
 """Core package for CMIS NK model simulations and game-table generation."""
 
 from .landscape import NKLandscape
+from .fitness_cache import FitnessCache
+from .landscape_store import LandscapeStore, landscape_hash
+from .analytics import LandscapeAnalysis, LandscapeAnalyzer, RuggednessConfig, analyze_landscape
+from .enumeration import LandscapeSummary, enumerate_fitness, summarize_fitness
 from .agents import Agent, create_agents
-from .networks import NetworkFactory
+from .networks import CompiledGraph, NetworkFactory
 from .simulation import SimulationConfig, SimulationEngine, SimulationResult
 from .local_search import LocalSearchConfig, LocalSearchEngine, LocalSearchResult
 from .common.game_types import GameTableRecord
@@ -22,13 +26,26 @@ from .ethiraj2004 import (
     EthirajGameTableBuilder,
 )
 from .utils import bitstring_to_array, split_bits_evenly, enumerate_coalitions
+from .packed import pack_states, unpack_states, bitstring_to_packed
+from .procedural import ProceduralTables
 from .pipeline import run_experiment, protocol_from_name
 
 __all__ = [
     "NKLandscape",
+    "FitnessCache",
+    "LandscapeStore",
+    "landscape_hash",
+    "LandscapeAnalysis",
+    "LandscapeAnalyzer",
+    "RuggednessConfig",
+    "analyze_landscape",
+    "LandscapeSummary",
+    "enumerate_fitness",
+    "summarize_fitness",
     "Agent",
     "create_agents",
     "NetworkFactory",
+    "CompiledGraph",
     "SimulationConfig",
     "SimulationEngine",
     "SimulationResult",
@@ -51,6 +68,10 @@ __all__ = [
     "bitstring_to_array",
     "split_bits_evenly",
     "enumerate_coalitions",
+    "pack_states",
+    "unpack_states",
+    "bitstring_to_packed",
+    "ProceduralTables",
     "run_experiment",
     "protocol_from_name",
 ]
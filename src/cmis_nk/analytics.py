@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Literal, Optional
+
+import numpy as np
+
+from .landscape import NKLandscape
+from .packed import pack_states, packed_key
+
+
+AdaptiveWalkMode = Literal["steepest", "random_fitter"]
+
+
+@dataclass
+class RuggednessConfig:
+    walkers: int = 1000
+    walk_length: int = 200
+    max_lag: int = 10
+    adaptive_walkers: int = 1000
+    adaptive_mode: AdaptiveWalkMode = "steepest"
+    max_adaptive_steps: Optional[int] = None  # None -> 10 * N
+    histogram_bins: int = 20
+    rng_seed: Optional[int] = None
+
+
+@dataclass
+class LandscapeAnalysis:
+    N: int
+    K: int
+    autocorrelation: List[float]
+    correlation_length: Optional[float]
+    optima_fitness_mean: float
+    optima_fitness_std: float
+    optima_fitness_quantiles: Dict[str, float]
+    optima_fitness_histogram: List[int]
+    optima_fitness_bin_edges: List[float]
+    walk_length_mean: float
+    walk_length_std: float
+    walk_length_max: int
+    unfinished_walks: int
+    distinct_optima: int
+    estimated_optima_chao1: float
+    top_basin_shares: List[float] = field(default_factory=list)
+    config: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class LandscapeAnalyzer:
+    """Ruggedness statistics from random/adaptive walks run in lockstep as matrices."""
+
+    def __init__(self, landscape: NKLandscape, config: Optional[RuggednessConfig] = None) -> None:
+        self.landscape = landscape
+        self.config = config or RuggednessConfig()
+        self.rng = np.random.default_rng(self.config.rng_seed)
+
+    def analyze(self) -> LandscapeAnalysis:
+        autocorrelation = self.random_walk_autocorrelation()
+        rho1 = autocorrelation[0] if autocorrelation else 0.0
+        correlation_length = -1.0 / np.log(abs(rho1)) if 0.0 < abs(rho1) < 1.0 else None
+        optima_states, optima_fitness, walk_lengths, finished = self.adaptive_walks()
+
+        quantiles = np.quantile(optima_fitness, [0.1, 0.25, 0.5, 0.75, 0.9])
+        histogram, bin_edges = np.histogram(optima_fitness, bins=self.config.histogram_bins)
+        counts = Counter(packed_key(row) for row in pack_states(optima_states[finished]))
+        hit_counts = sorted(counts.values(), reverse=True)
+        singletons = sum(1 for count in hit_counts if count == 1)
+        doubletons = sum(1 for count in hit_counts if count == 2)
+        # Chao1: 1 回・2 回しか到達しなかった局所最適の数から未観測の最適数を補正
+        chao1 = len(hit_counts) + (
+            singletons**2 / (2.0 * doubletons) if doubletons else singletons * (singletons - 1) / 2.0
+        )
+        total_hits = float(sum(hit_counts)) or 1.0
+        return LandscapeAnalysis(
+            N=self.landscape.N,
+            K=self.landscape.K,
+            autocorrelation=[float(value) for value in autocorrelation],
+            correlation_length=float(correlation_length) if correlation_length is not None else None,
+            optima_fitness_mean=float(np.mean(optima_fitness)),
+            optima_fitness_std=float(np.std(optima_fitness)),
+            optima_fitness_quantiles={
+                f"q{int(q * 100):02d}": float(value)
+                for q, value in zip([0.1, 0.25, 0.5, 0.75, 0.9], quantiles)
+            },
+            optima_fitness_histogram=[int(count) for count in histogram],
+            optima_fitness_bin_edges=[float(edge) for edge in bin_edges],
+            walk_length_mean=float(np.mean(walk_lengths)),
+            walk_length_std=float(np.std(walk_lengths)),
+            walk_length_max=int(np.max(walk_lengths)),
+            unfinished_walks=int((~finished).sum()),
+            distinct_optima=len(hit_counts),
+            estimated_optima_chao1=float(chao1),
+            top_basin_shares=[count / total_hits for count in hit_counts[:10]],
+            config=asdict(self.config),
+        )
+
+    def random_walk_autocorrelation(self) -> List[float]:
+        """Autocorrelation rho(s), s = 1..max_lag, of F along one-bit random walks."""
+
+        landscape = self.landscape
+        walkers, length = self.config.walkers, self.config.walk_length
+        states = self.rng.integers(0, 2, size=(walkers, landscape.N), dtype=np.int8)
+        contributions = landscape._contributions(states)
+        series = np.empty((walkers, length + 1))
+        series[:, 0] = landscape._fitness_from_contributions(contributions)
+        batch = np.arange(walkers)
+        for step in range(1, length + 1):
+            bits = self.rng.integers(0, landscape.N, size=walkers)
+            series[:, step], contributions = landscape.flip_delta_many(states, contributions, bits)
+            states[batch, bits] ^= 1
+        centered = series - series.mean()
+        variance = float(np.mean(centered**2))
+        if variance == 0.0:
+            return [0.0] * self.config.max_lag
+        return [
+            float(np.mean(centered[:, :-lag] * centered[:, lag:]) / variance)
+            for lag in range(1, min(self.config.max_lag, length) + 1)
+        ]
+
+    def adaptive_walks(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Run adaptive walks until no one-bit neighbor is fitter.
+
+        Returns the final states, their fitness, the number of moves of each walk
+        and a mask of walks that actually reached a local optimum.
+        """
+
+        landscape = self.landscape
+        walkers = self.config.adaptive_walkers
+        max_steps = self.config.max_adaptive_steps or 10 * landscape.N
+        states = self.rng.integers(0, 2, size=(walkers, landscape.N), dtype=np.int8)
+        contributions = landscape._contributions(states)
+        fitness = landscape._fitness_from_contributions(contributions)
+        lengths = np.zeros(walkers, dtype=np.int64)
+        active = np.ones(walkers, dtype=bool)
+        for _ in range(max_steps):
+            idx = np.flatnonzero(active)
+            if idx.size == 0:
+                break
+            deltas = landscape.neighborhood_deltas_many(states[idx], contributions=contributions[idx])
+            improving = deltas > 0
+            can_move = improving.any(axis=1)
+            active[idx[~can_move]] = False
+            idx, deltas, improving = idx[can_move], deltas[can_move], improving[can_move]
+            if idx.size == 0:
+                break
+            if self.config.adaptive_mode == "random_fitter":
+                # 改善近傍の中から一様に 1 つ選ぶ（Kauffman の adaptive walk）
+                scores = np.where(improving, self.rng.random(improving.shape), -1.0)
+                bits = np.argmax(scores, axis=1)
+            else:
+                bits = np.argmax(deltas, axis=1)
+            fitness[idx], contributions[idx] = landscape.flip_delta_many(
+                states[idx], contributions[idx], bits
+            )
+            states[idx, bits] ^= 1
+            lengths[idx] += 1
+        return states, fitness, lengths, ~active
+
+
+def analyze_landscape(
+    landscape: NKLandscape,
+    config: Optional[RuggednessConfig] = None,
+) -> LandscapeAnalysis:
+    return LandscapeAnalyzer(landscape, config).analyze()
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import json
 import sys
 from pathlib import Path
 from typing import Sequence
 
-from .pipeline import run_experiment, build_landscape
+from .analytics import RuggednessConfig, analyze_landscape
+from .pipeline import run_experiment, build_scenario_landscape
 from .config_loader import load_experiment_config
 from .visualization import (
     plot_game_table,
@@ -13,7 +15,7 @@ from .visualization import (
     plot_module_dependency_graph,
 )
 from .utils import bitstring_to_array
-from .ethiraj2004 import build_true_modules, build_designer_modules, build_ethiraj_landscape
+from .ethiraj2004 import build_true_modules, build_designer_modules
 
 
 def main(argv: Sequence[str] | None = None) -> int:
@@ -43,6 +45,24 @@ def main(argv: Sequence[str] | None = None) -> int:
         default=None,
         help="Limit coalition size evaluated (overrides config max_coalition_size)",
     )
+    run_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for coalition evaluation (overrides config game_table.workers)",
+    )
+    run_parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="SQLite file recording finished coalitions (Lazer2007 / Levinthal1997)",
+    )
+    run_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip coalitions already in the checkpoint "
+        "(default file: outputs/checkpoints/<scenario>.sqlite)",
+    )
+    _add_landscape_cache_argument(run_parser)
     run_parser.set_defaults(func=_handle_run)
 
     plot_parser = subparsers.add_parser(
@@ -96,6 +116,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         default=None,
         help="Directory to save heatmap (default: outputs/figures/<scenario>)",
     )
+    _add_landscape_cache_argument(plot_land_parser)
     plot_land_parser.set_defaults(func=_handle_plot_landscape)
 
     plot_module_parser = subparsers.add_parser(
@@ -114,8 +135,41 @@ def main(argv: Sequence[str] | None = None) -> int:
         default=None,
         help="Directory to save figures (default: outputs/figures/ethiraj2004)",
     )
+    _add_landscape_cache_argument(plot_module_parser)
     plot_module_parser.set_defaults(func=_handle_plot_modules)
 
+    analyze_parser = subparsers.add_parser(
+        "analyze-landscape",
+        help="Characterize landscape ruggedness (autocorrelation, local optima) as JSON",
+    )
+    analyze_parser.add_argument("--config", required=True, help="Path to config YAML")
+    analyze_parser.add_argument(
+        "--walkers", type=int, default=1000, help="Number of random walks (default: 1000)"
+    )
+    analyze_parser.add_argument(
+        "--walk-length", type=int, default=200, help="Steps per random walk (default: 200)"
+    )
+    analyze_parser.add_argument(
+        "--adaptive-walkers",
+        type=int,
+        default=1000,
+        help="Number of adaptive walks to local optima (default: 1000)",
+    )
+    analyze_parser.add_argument(
+        "--adaptive-mode",
+        choices=["steepest", "random_fitter"],
+        default="steepest",
+        help="Neighbor choice in adaptive walks (default: steepest)",
+    )
+    analyze_parser.add_argument(
+        "--seed", type=int, default=None, help="RNG seed (default: seeds.random in config)"
+    )
+    analyze_parser.add_argument(
+        "--output", default=None, help="Optional JSON output path (default: print to stdout)"
+    )
+    _add_landscape_cache_argument(analyze_parser)
+    analyze_parser.set_defaults(func=_handle_analyze_landscape)
+
     args = parser.parse_args(argv)
     if not hasattr(args, "func"):
         parser.print_help()
@@ -123,11 +177,23 @@ def main(argv: Sequence[str] | None = None) -> int:
     return args.func(args)
 
 
+def _add_landscape_cache_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--landscape-cache",
+        default=None,
+        help="Directory of the content-addressed landscape store (reuse generated landscapes)",
+    )
+
+
 def _handle_run(args: argparse.Namespace) -> int:
     output_path, rows = run_experiment(
         args.config,
         output_override=args.output,
         max_coalition_size=args.max_size,
+        landscape_cache=args.landscape_cache,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
     )
     print(f"Saved {rows} coalition rows to {Path(output_path)}")
     return 0
@@ -142,21 +208,9 @@ def _handle_plot_table(args: argparse.Namespace) -> int:
 def _handle_plot_landscape(args: argparse.Namespace) -> int:
     exp = load_experiment_config(args.config)
     scenario = exp.scenario_type
-    if scenario == "ethiraj2004":
-        if not exp.ethiraj:
-            raise ValueError("Ethiraj 設定が見つかりません")
-        true_modules = build_true_modules(exp.N, exp.ethiraj.true_modules)
-        designer_modules = build_designer_modules(exp.N, exp.ethiraj.designer_modules)
-        landscape = build_ethiraj_landscape(
-            N=exp.N,
-            K=exp.K,
-            true_modules=true_modules,
-            intra_bias=exp.ethiraj.intra_density,
-            inter_bias=exp.ethiraj.inter_density,
-            seed=exp.landscape_seed or exp.random_seed,
-        )
-    else:
-        landscape = build_landscape(exp)
+    if scenario == "ethiraj2004" and not exp.ethiraj:
+        raise ValueError("Ethiraj 設定が見つかりません")
+    landscape = build_scenario_landscape(exp, args.landscape_cache)
     baseline_bits = args.baseline if args.baseline is not None else "0" * exp.N
     baseline_state = bitstring_to_array(baseline_bits, exp.N)
     output_dir = Path(args.output_dir) if args.output_dir else Path("outputs/figures") / scenario
@@ -172,20 +226,36 @@ def _handle_plot_landscape(args: argparse.Namespace) -> int:
     return 0
 
 
+def _handle_analyze_landscape(args: argparse.Namespace) -> int:
+    exp = load_experiment_config(args.config)
+    landscape = build_scenario_landscape(exp, args.landscape_cache)
+    config = RuggednessConfig(
+        walkers=args.walkers,
+        walk_length=args.walk_length,
+        adaptive_walkers=args.adaptive_walkers,
+        adaptive_mode=args.adaptive_mode,
+        rng_seed=args.seed if args.seed is not None else exp.random_seed,
+    )
+    report = analyze_landscape(landscape, config).to_dict()
+    report["scenario"] = exp.scenario_type
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_text(payload + "\n", encoding="utf-8")
+        print(f"Saved landscape analysis to {output_path}")
+    else:
+        print(payload)
+    return 0
+
+
 def _handle_plot_modules(args: argparse.Namespace) -> int:
     exp = load_experiment_config(args.config)
     if exp.scenario_type != "ethiraj2004" or not exp.ethiraj:
         raise ValueError("plot-modules は scenario.type=ethiraj2004 の設定でのみ使用できます")
     true_modules = build_true_modules(exp.N, exp.ethiraj.true_modules)
     designer_modules = build_designer_modules(exp.N, exp.ethiraj.designer_modules)
-    landscape = build_ethiraj_landscape(
-        N=exp.N,
-        K=exp.K,
-        true_modules=true_modules,
-        intra_bias=exp.ethiraj.intra_density,
-        inter_bias=exp.ethiraj.inter_density,
-        seed=exp.landscape_seed or exp.random_seed,
-    )
+    landscape = build_scenario_landscape(exp, args.landscape_cache)
     output_dir = Path(args.output_dir) if args.output_dir else Path("outputs/figures") / "ethiraj2004"
     saved_paths: list[Path] = []
     if args.basis in {"true", "both"}:
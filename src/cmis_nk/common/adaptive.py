@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Callable, Iterable, Sequence
+
+
+@dataclass
+class AdaptiveSampling:
+    """Stop sampling a coalition once the CI half-width of its mean is small enough."""
+
+    tolerance: float  # 信頼区間の半幅の目標値
+    min_runs: int = 5
+    max_runs: int = 200
+    confidence: float = 0.95
+    batch_size: int = 5  # min_runs 以降に 1 回で追加する run 数
+
+    def __post_init__(self) -> None:
+        if self.tolerance <= 0.0:
+            raise ValueError("tolerance must be positive")
+        if not 0.0 < self.confidence < 1.0:
+            raise ValueError("confidence must be in (0, 1)")
+        if self.min_runs < 2 or self.max_runs < self.min_runs or self.batch_size < 1:
+            raise ValueError("require 2 <= min_runs <= max_runs and batch_size >= 1")
+
+    @property
+    def z_value(self) -> float:
+        return NormalDist().inv_cdf(0.5 + self.confidence / 2.0)
+
+    def note(self) -> str:
+        return f"ci_tol={self.tolerance:g};ci_conf={self.confidence:g}"
+
+
+class RunningStats:
+    """Welford's online mean / variance."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.push(float(value))
+
+    @property
+    def std(self) -> float:
+        """Population std (matches ``np.std`` used for fixed-run tables)."""
+
+        return math.sqrt(self._m2 / self.count) if self.count else 0.0
+
+    @property
+    def sample_std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def half_width(self, z_value: float) -> float:
+        if self.count < 2:
+            return math.inf
+        return z_value * self.sample_std / math.sqrt(self.count)
+
+
+def sample_adaptively(
+    sample: Callable[[int], Sequence[float]],
+    sampling: AdaptiveSampling,
+) -> RunningStats:
+    """Call ``sample(n)`` in batches until the CI half-width or ``max_runs`` is reached."""
+
+    stats = RunningStats()
+    z_value = sampling.z_value
+    stats.extend(sample(sampling.min_runs))
+    while stats.count < sampling.max_runs and stats.half_width(z_value) > sampling.tolerance:
+        stats.extend(sample(min(sampling.batch_size, sampling.max_runs - stats.count)))
+    return stats
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Sequence
+
+import numpy as np
+
+
+HistoryLevel = Literal["none", "summary", "per_round"]
+HISTORY_LEVELS = ("none", "summary", "per_round")
+
+
+@dataclass
+class HistoryTrace:
+    """Recorded rounds of one run as columns."""
+
+    rounds: np.ndarray  # (T,) 記録したラウンド番号
+    mean: np.ndarray  # (T,)
+    max: np.ndarray  # (T,)
+    agent_scores: Optional[np.ndarray] = None  # (T, A)
+
+    def to_records(
+        self,
+        mean_key: str = "mean_score",
+        max_key: str = "max_score",
+    ) -> List[Dict[str, float]]:
+        """Row-wise dicts in the legacy ``history`` format."""
+
+        return [
+            {"round": float(round_idx), mean_key: float(mean), max_key: float(best)}
+            for round_idx, mean, best in zip(self.rounds, self.mean, self.max)
+        ]
+
+
+class HistoryRecorder:
+    """Per-round mean / max (and optionally per-agent) scores in preallocated arrays.
+
+    ``level`` selects which rounds are kept: ``none`` keeps nothing, ``summary``
+    only the last round and ``per_round`` every ``stride``-th round plus the
+    last one. Arrays carry a leading run dimension so one recorder can serve a
+    batch of runs.
+    """
+
+    def __init__(
+        self,
+        rounds: int,
+        level: HistoryLevel = "per_round",
+        stride: int = 1,
+        num_runs: int = 1,
+        num_agents: int = 0,
+        agent_scores: bool = False,
+    ) -> None:
+        if level not in HISTORY_LEVELS:
+            raise ValueError(f"Unsupported history level: {level}")
+        if stride < 1:
+            raise ValueError("history stride must be positive")
+        rounds = max(0, int(rounds))
+        if level == "none" or rounds == 0:
+            kept = np.zeros(0, dtype=np.intp)
+        elif level == "summary":
+            kept = np.array([rounds - 1], dtype=np.intp)
+        else:
+            kept = np.union1d(np.arange(0, rounds, stride), [rounds - 1]).astype(np.intp)
+        self.level = level
+        self.rounds = kept
+        # ラウンド番号 -> 記録列（記録しないラウンドは -1）
+        self._slot = np.full(rounds, -1, dtype=np.intp)
+        self._slot[kept] = np.arange(kept.size)
+        self.mean = np.zeros((num_runs, kept.size))
+        self.max = np.zeros((num_runs, kept.size))
+        self.agent_scores = np.zeros((num_runs, kept.size, num_agents)) if agent_scores else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rounds.size > 0
+
+    def keeps(self, round_idx: int) -> bool:
+        return 0 <= round_idx < self._slot.size and self._slot[round_idx] >= 0
+
+    def record(self, round_idx: int, scores: np.ndarray, runs: Optional[Sequence[int]] = None) -> None:
+        """Store the stats of ``scores`` ((R', A) or (A,)) for ``round_idx`` if that round is kept."""
+
+        if self.keeps(round_idx):
+            self._store(self._slot[round_idx : round_idx + 1], scores, runs)
+
+    def record_through(
+        self,
+        first_round: int,
+        scores: np.ndarray,
+        runs: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Store ``scores`` for every kept round from ``first_round`` on (used after convergence)."""
+
+        slots = self._slot[first_round:]
+        slots = slots[slots >= 0]
+        if slots.size:
+            self._store(slots, scores, runs)
+
+    def trace(self, run: int = 0) -> HistoryTrace:
+        return HistoryTrace(
+            rounds=self.rounds.copy(),
+            mean=self.mean[run].copy(),
+            max=self.max[run].copy(),
+            agent_scores=self.agent_scores[run].copy() if self.agent_scores is not None else None,
+        )
+
+    def _store(self, slots: np.ndarray, scores: np.ndarray, runs: Optional[Sequence[int]]) -> None:
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        rows = np.arange(self.mean.shape[0]) if runs is None else np.asarray(runs, dtype=np.intp)
+        if scores.shape[1]:
+            mean = scores.mean(axis=1)
+            best = scores.max(axis=1)
+        else:
+            mean = best = np.zeros(scores.shape[0])
+        index = np.ix_(rows, slots)
+        self.mean[index] = mean[:, np.newaxis]
+        self.max[index] = best[:, np.newaxis]
+        if self.agent_scores is not None:
+            self.agent_scores[index] = scores[:, np.newaxis, :]
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+
+def root_entropy(seed: Optional[int]) -> int:
+    """Entropy of the root SeedSequence (fresh OS entropy when ``seed`` is None)."""
+
+    return int(np.random.SeedSequence(seed).entropy)
+
+
+def spawn_seed(entropy: int, *key: int) -> int:
+    """Integer seed of the child stream ``key`` of the root ``entropy``.
+
+    Equivalent to walking ``SeedSequence(entropy).spawn`` down to ``key`` but
+    computed directly, so a stream depends only on its key (e.g. the coalition
+    index) and not on the order or process in which it is requested.
+    """
+
+    sequence = np.random.SeedSequence(entropy, spawn_key=tuple(int(part) for part in key))
+    return int(sequence.generate_state(1, dtype=np.uint64)[0])
@@ -6,9 +6,14 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+from .common.adaptive import AdaptiveSampling
+from .common.history import HISTORY_LEVELS
 from .simulation import SimulationConfig
 
 
+LANDSCAPE_BACKENDS = ("dense", "procedural")
+
+
 @dataclass
 class LevinthalSettings:
     max_steps: int
@@ -18,6 +23,10 @@ class LevinthalSettings:
     perturb_prob: float
     baseline_state: str
     players: Optional[List[Dict[str, Any]]]
+    batch_trials: bool = True
+    strategy: str = "random_sample"
+    exact_max_bits: Optional[int] = None
+    dedupe: str = "off"
 
 
 @dataclass
@@ -60,6 +69,17 @@ class ExperimentConfig:
     network_seed: Optional[int]
     max_coalition_size: Optional[int]
     output_path: Path
+    fitness_cache_size: Optional[int] = None
+    landscape_backend: str = "dense"
+    workers: Optional[int] = None
+    adaptive: Optional[AdaptiveSampling] = None
+    simulation_backend: str = "reference"
+    detect_convergence: bool = True
+    stall_rounds: Optional[int] = None
+    history: str = "per_round"
+    history_stride: int = 1
+    record_agent_scores: bool = False
+    decompose_components: bool = False
     lazer: Optional[LazerSettings] = None
     levinthal: Optional[LevinthalSettings] = None
     ethiraj: Optional[EthirajSettings] = None
@@ -72,6 +92,12 @@ class ExperimentConfig:
             local_search_scope=self.local_search_scope,  # type: ignore[arg-type]
             rng_seed=self.random_seed,
             accept_equal=self.accept_equal,
+            backend=self.simulation_backend,  # type: ignore[arg-type]
+            detect_convergence=self.detect_convergence,
+            stall_rounds=self.stall_rounds,
+            history=self.history,  # type: ignore[arg-type]
+            history_stride=self.history_stride,
+            record_agent_scores=self.record_agent_scores,
         )
 
 
@@ -85,6 +111,10 @@ def load_experiment_config(path: str | Path) -> ExperimentConfig:
     seeds = raw.get("seeds", {})
     output = raw.get("output", {})
     scenario = raw.get("scenario", {})
+    landscape = raw.get("landscape", {}) or {}
+    landscape_backend = str(landscape.get("backend", "dense")).lower()
+    if landscape_backend not in LANDSCAPE_BACKENDS:
+        raise ValueError(f"Unsupported landscape backend: {landscape_backend}")
     scenario_type = scenario.get("type", "lazer2007").lower()
     lazer_settings: Optional[LazerSettings] = None
     levinthal_settings: Optional[LevinthalSettings] = None
@@ -126,6 +156,10 @@ def load_experiment_config(path: str | Path) -> ExperimentConfig:
             perturb_prob=float(search.get("perturb_prob", 0.15)),
             baseline_state=str(baseline_state),
             players=players_cfg,
+            batch_trials=bool(search.get("batch_trials", True)),
+            strategy=str(search.get("strategy", "random_sample")).lower(),
+            exact_max_bits=_maybe_int(search.get("exact_max_bits")),
+            dedupe=_parse_dedupe(search.get("dedupe")),
         )
     if scenario_type == "ethiraj2004":
         eth = raw.get("ethiraj", {})
@@ -160,12 +194,56 @@ def load_experiment_config(path: str | Path) -> ExperimentConfig:
         network_seed=_maybe_int(seeds.get("network")),
         max_coalition_size=_maybe_int(game_table.get("max_coalition_size")),
         output_path=Path(output.get("path", "outputs/tables/lazer2007_baseline.csv")),
+        fitness_cache_size=_maybe_int(game_table.get("fitness_cache_size")),
+        landscape_backend=landscape_backend,
+        workers=_maybe_int(game_table.get("workers")),
+        adaptive=_parse_adaptive(game_table.get("adaptive")),
+        simulation_backend=str(sim.get("backend", "reference")).lower(),
+        detect_convergence=bool(sim.get("detect_convergence", True)),
+        stall_rounds=_maybe_int(sim.get("stall_rounds")),
+        history=_parse_history_level(sim.get("history")),
+        history_stride=int(sim.get("history_stride", 1)),
+        record_agent_scores=bool(sim.get("record_agent_scores", False)),
+        decompose_components=bool(game_table.get("decompose_components", False)),
         lazer=lazer_settings,
         levinthal=levinthal_settings,
         ethiraj=ethiraj_settings,
     )
 
 
+def _parse_history_level(raw: Any) -> str:
+    # YAML の `off` / `false` は bool として読まれるので記録なし（none）として扱う
+    if raw is None:
+        return "per_round"
+    if raw is False:
+        return "none"
+    level = str(raw).lower()
+    if level not in HISTORY_LEVELS:
+        raise ValueError(f"Unsupported history level: {raw}")
+    return level
+
+
+def _parse_dedupe(raw: Any) -> str:
+    # YAML では `off` / `on` が bool として読まれるため明示的に変換する
+    if raw is None or raw is False:
+        return "off"
+    if raw is True:
+        return "shared"
+    return str(raw).lower()
+
+
+def _parse_adaptive(raw: Any) -> Optional[AdaptiveSampling]:
+    if not raw:
+        return None
+    return AdaptiveSampling(
+        tolerance=float(raw["tolerance"]),
+        min_runs=int(raw.get("min_runs", 5)),
+        max_runs=int(raw.get("max_runs", 200)),
+        confidence=float(raw.get("confidence", 0.95)),
+        batch_size=int(raw.get("batch_size", 5)),
+    )
+
+
 def _maybe_int(value: Any) -> Optional[int]:
     if value is None:
         return None
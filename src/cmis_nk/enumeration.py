@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .landscape import NKLandscape
+
+
+MAX_ENUMERATION_BITS = 34
+
+
+@dataclass
+class LandscapeSummary:
+    """Statistics computed from a fully enumerated fitness vector."""
+
+    N: int
+    global_max: float
+    global_max_state: np.ndarray
+    global_min: float
+    mean: float
+    std: float
+    local_optima: int
+    histogram: np.ndarray
+    bin_edges: np.ndarray
+
+
+def state_to_index(state: np.ndarray) -> int:
+    """Map a 0/1 state to its index in the enumerated fitness vector (bit 0 = MSB)."""
+
+    index = 0
+    for bit in np.asarray(state):
+        index = (index << 1) | int(bit)
+    return index
+
+
+def index_to_state(index: int, N: int) -> np.ndarray:
+    shifts = np.arange(N - 1, -1, -1)
+    return ((int(index) >> shifts) & 1).astype(np.int8)
+
+
+def enumerate_fitness(
+    landscape: "NKLandscape",
+    path: str | Path | None = None,
+    block_bits: int = 16,
+) -> np.memmap:
+    """Write F(d) for all 2^N states to a float32 memmap indexed by `state_to_index`.
+
+    The leading N - block_bits bits are walked in Gray-code order, so moving to the
+    next block flips a single bit and only its reverse-dependency rows are updated
+    (O(K)). The trailing ``block_bits`` bits are swept as one vectorized block with
+    precomputed per-row pattern offsets.
+
+    With an explicit ``path`` the file belongs to the caller and is kept. Without
+    one the vector goes to an anonymous temporary file that is unlinked as soon
+    as it is mapped, so the disk space is released with the returned memmap.
+    """
+
+    N = landscape.N
+    if N > MAX_ENUMERATION_BITS:
+        raise ValueError(f"enumeration supports N <= {MAX_ENUMERATION_BITS} (got N={N})")
+    anonymous = path is None
+    if anonymous:
+        handle = tempfile.NamedTemporaryFile(prefix="nk_fitness_", suffix=".f32", delete=False)
+        handle.close()
+        path = handle.name
+    low_width = max(0, min(int(block_bits), N))
+    high_width = N - low_width
+    block = 1 << low_width
+    try:
+        fitness = np.memmap(Path(path), dtype=np.float32, mode="w+", shape=(1 << N,))
+    finally:
+        if anonymous:
+            # POSIX ではマップ済みの領域は unlink 後も有効で、memmap の解放時に領域が返る
+            os.unlink(path)
+
+    dep_index = landscape._dep_index
+    weights = landscape._shift_weights
+    lookup = landscape._lookup
+    # 下位ブロックのビット (state 位置 >= high_width) が各行のパターン index に与える寄与
+    low_ints = np.arange(block, dtype=np.int64)
+    in_low = (dep_index >= high_width) & (weights > 0)
+    low_rows = np.flatnonzero(in_low.any(axis=1))
+    low_offsets = np.zeros((low_rows.size, block), dtype=np.int64)
+    for out_idx, row in enumerate(low_rows):
+        for pos in np.flatnonzero(in_low[row]):
+            shift = N - 1 - int(dep_index[row, pos])
+            low_offsets[out_idx] += ((low_ints >> shift) & 1) * weights[row, pos]
+    high_only = np.ones(N, dtype=bool)
+    high_only[low_rows] = False
+    high_rows = np.flatnonzero(high_only)
+
+    # 上位ビットすべて 0 から Gray コード順に 1 ビットずつ反転していく
+    base_patterns = np.zeros(N, dtype=np.int64)
+    high_int = 0
+    for step in range(1 << high_width):
+        if step:
+            flip = (step & -step).bit_length() - 1
+            high_int ^= 1 << flip
+            bit = high_width - 1 - flip
+            lo, hi = landscape._rev_ptr[bit], landscape._rev_ptr[bit + 1]
+            base_patterns[landscape._rev_rows[lo:hi]] ^= landscape._rev_weights[lo:hi]
+        constant = float(lookup(high_rows, base_patterns[high_rows]).sum())
+        totals = np.full(block, constant)
+        for out_idx, row in enumerate(low_rows):
+            totals += lookup(row, base_patterns[row] + low_offsets[out_idx])
+        fitness[high_int * block : (high_int + 1) * block] = totals / N
+    fitness.flush()
+    return fitness
+
+
+def summarize_fitness(
+    fitness: np.ndarray,
+    N: int,
+    bins: int = 50,
+    block_bits: int = 16,
+) -> LandscapeSummary:
+    """Global max/min, moments, local-optima count and histogram of an enumerated vector.
+
+    A state counts as a local optimum when no one-bit neighbor is strictly fitter.
+    The vector is streamed in blocks so it can stay on disk (memmap).
+    """
+
+    total = 1 << N
+    if len(fitness) != total:
+        raise ValueError("fitness must have 2**N entries")
+    block = 1 << max(0, min(int(block_bits), N))
+    low_width = block.bit_length() - 1
+
+    best_value = float("-inf")
+    best_index = 0
+    min_value = float("inf")
+    value_sum = 0.0
+    square_sum = 0.0
+    for start in range(0, total, block):
+        values = np.asarray(fitness[start : start + block], dtype=np.float64)
+        local_best = int(np.argmax(values))
+        if values[local_best] > best_value:
+            best_value = float(values[local_best])
+            best_index = start + local_best
+        min_value = min(min_value, float(values.min()))
+        value_sum += float(values.sum())
+        square_sum += float(np.square(values).sum())
+    mean = value_sum / total
+    variance = max(square_sum / total - mean**2, 0.0)
+
+    bin_edges = np.linspace(min_value, best_value, bins + 1)
+    histogram = np.zeros(bins, dtype=np.int64)
+    local_optima = 0
+    offsets = np.arange(block)
+    for start in range(0, total, block):
+        values = np.asarray(fitness[start : start + block])
+        is_optimum = np.ones(values.size, dtype=bool)
+        for shift in range(low_width):
+            is_optimum &= values >= values[offsets ^ (1 << shift)]
+        for shift in range(low_width, N):
+            neighbor_start = start ^ (1 << shift)
+            is_optimum &= values >= fitness[neighbor_start : neighbor_start + block]
+        local_optima += int(is_optimum.sum())
+        histogram += np.histogram(values, bins=bin_edges)[0]
+
+    return LandscapeSummary(
+        N=N,
+        global_max=best_value,
+        global_max_state=index_to_state(best_index, N),
+        global_min=min_value,
+        mean=mean,
+        std=float(np.sqrt(variance)),
+        local_optima=local_optima,
+        histogram=histogram,
+        bin_edges=bin_edges,
+    )
+
+
+def fitness_rank(fitness: np.ndarray, value: float, block_size: int = 1 << 16) -> int:
+    """Return the 1-based rank of ``value`` (1 + number of strictly fitter states)."""
+
+    fitter = 0
+    threshold = np.float32(value)
+    for start in range(0, len(fitness), block_size):
+        fitter += int(np.count_nonzero(np.asarray(fitness[start : start + block_size]) > threshold))
+    return fitter + 1
+
+
+def load_fitness(path: str | Path, N: int) -> np.memmap:
+    return np.memmap(Path(path), dtype=np.float32, mode="r", shape=(1 << N,))
@@ -5,6 +5,8 @@ from typing import Iterable, List, Sequence
 
 import numpy as np
 
+from ..common.history import HistoryLevel, HistoryRecorder
+from ..fitness_cache import FitnessCache
 from ..landscape import NKLandscape
 
 
@@ -23,8 +25,10 @@ class EthirajFirmPopulation:
         num_firms: int,
         baseline_state: np.ndarray,
         rng_seed: int | None,
+        fitness_cache: FitnessCache | None = None,
     ) -> None:
         self.landscape = landscape
+        self.fitness_cache = fitness_cache
         self.designer_modules = [list(module) for module in designer_modules]
         self.num_firms = num_firms
         self.baseline_state = baseline_state.astype(np.int8)
@@ -34,17 +38,17 @@ class EthirajFirmPopulation:
     def local_search_step(self) -> None:
         for firm_idx in range(self.num_firms):
             state = self.states[firm_idx]
+            contributions = self.landscape.contributions(state)
             for module_bits in self.designer_modules:
                 if not module_bits:
                     continue
                 bit = int(self.rng.choice(module_bits))
-                candidate = state.copy()
-                candidate[bit] = 1 - candidate[bit]
-                current_fitness = _module_fitness(self.landscape, state, module_bits)
-                candidate_fitness = _module_fitness(self.landscape, candidate, module_bits)
+                _, candidate_contributions = self.landscape.flip_delta(state, contributions, bit)
+                current_fitness = _module_mean(contributions, module_bits)
+                candidate_fitness = _module_mean(candidate_contributions, module_bits)
                 if candidate_fitness > current_fitness:
-                    state = candidate
-            self.states[firm_idx] = state
+                    state[bit] = 1 - state[bit]
+                    contributions = candidate_contributions
 
     def recombine(self, mode: str) -> None:
         mode_lower = mode.lower()
@@ -59,7 +63,8 @@ class EthirajFirmPopulation:
             return
 
     def evaluate_all(self) -> np.ndarray:
-        return np.array([self.landscape.evaluate(state) for state in self.states])
+        evaluator = self.fitness_cache if self.fitness_cache is not None else self.landscape
+        return evaluator.evaluate_many(self.states)
 
     def best_state(self) -> np.ndarray:
         scores = self.evaluate_all()
@@ -111,14 +116,13 @@ def _module_fitness(
 ) -> float:
     if not module_bits:
         return 0.0
-    contributions: List[float] = []
-    for idx in module_bits:
-        local_bits = [idx, *landscape.dependencies[idx]]
-        pattern_index = 0
-        for bit in local_bits:
-            pattern_index = (pattern_index << 1) | int(state[bit])
-        contributions.append(float(landscape.tables[idx][pattern_index]))
-    return float(np.mean(contributions)) if contributions else 0.0
+    return _module_mean(landscape.contributions(state), module_bits)
+
+
+def _module_mean(contributions: np.ndarray, module_bits: Sequence[int]) -> float:
+    if not module_bits:
+        return 0.0
+    return float(np.mean(contributions[list(module_bits)]))
 
 
 def run_ethiraj_simulation(
@@ -126,24 +130,19 @@ def run_ethiraj_simulation(
     rounds: int,
     recombination_interval: int,
     recombination_mode: str,
+    history: HistoryLevel = "per_round",
+    history_stride: int = 1,
 ) -> EthirajSimulationResult:
-    history: List[dict[str, float]] = []
+    recorder = HistoryRecorder(rounds, level=history, stride=history_stride)
     for step in range(rounds):
         population.local_search_step()
         if recombination_interval > 0 and (step + 1) % recombination_interval == 0:
             population.recombine(recombination_mode)
-        scores = population.evaluate_all()
-        if scores.size:
-            history.append(
-                {
-                    "round": float(step),
-                    "mean_fitness": float(np.mean(scores)),
-                    "max_fitness": float(np.max(scores)),
-                }
-            )
+        if recorder.keeps(step):
+            recorder.record(step, population.evaluate_all())
     best_state = population.best_state()
     return EthirajSimulationResult(
         best_state=best_state,
         baseline_state=population.baseline_state.copy(),
-        history=history,
+        history=recorder.trace().to_records(mean_key="mean_fitness", max_key="max_fitness"),
     )
@@ -23,6 +23,7 @@ def build_ethiraj_landscape(
     intra_bias: float,
     inter_bias: float,
     seed: int | None,
+    backend: str = "dense",
 ) -> NKLandscape:
     rng = np.random.default_rng(seed)
     module_map = {}
@@ -41,7 +42,8 @@ def build_ethiraj_landscape(
             inter_bias,
         )
         dependencies.append(dep)
-    return NKLandscape.from_random(
+    factory = NKLandscape.from_procedural if backend == "procedural" else NKLandscape.from_random
+    return factory(
         N=N,
         K=K,
         seed=seed,
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict
+
+import numpy as np
+
+from .landscape import NKLandscape
+from .packed import pack_states, packed_key
+
+
+class FitnessCache:
+    """Bounded LRU memo of F(d) keyed on the packed state.
+
+    One instance can be shared by every engine that works on the same landscape
+    (e.g. all coalitions and runs of a game table).
+    """
+
+    def __init__(self, landscape: NKLandscape, capacity: int = 100_000) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.landscape = landscape
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._values: "OrderedDict[bytes, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def evaluate(self, state: np.ndarray) -> float:
+        key = packed_key(pack_states(state))
+        value = self._values.get(key)
+        if value is not None:
+            self.hits += 1
+            self._values.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.landscape.evaluate(state)
+        self._store(key, value)
+        return value
+
+    def evaluate_many(self, states: np.ndarray) -> np.ndarray:
+        """Batched lookup; all misses are evaluated in a single kernel call."""
+
+        states = np.asarray(states)
+        keys = [packed_key(row) for row in pack_states(states)]
+        result = np.empty(len(keys), dtype=float)
+        missing = []
+        for idx, key in enumerate(keys):
+            value = self._values.get(key)
+            if value is None:
+                missing.append(idx)
+            else:
+                self.hits += 1
+                self._values.move_to_end(key)
+                result[idx] = value
+        if missing:
+            self.misses += len(missing)
+            values = self.landscape.evaluate_many(states[missing])
+            for idx, value in zip(missing, values):
+                result[idx] = value
+                self._store(keys[idx], float(value))
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": float(len(self._values)),
+            "capacity": float(self.capacity),
+            "hits": float(self.hits),
+            "misses": float(self.misses),
+            "evictions": float(self.evictions),
+            "hit_rate": self.hit_rate,
+        }
+
+    def clear(self) -> None:
+        self._values.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def _store(self, key: bytes, value: float) -> None:
+        self._values[key] = value
+        if len(self._values) > self.capacity:
+            self._values.popitem(last=False)
+            self.evictions += 1
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 import numpy as np
 
+from .enumeration import enumerate_fitness
+from .packed import PACKED_DTYPE, WORD_BITS, word_count
+from .procedural import ProceduralTables
+
 
 SkillProfile = Dict[str, Tuple[float, float]]
 ConflictPairs = Set[Tuple[int, int]]
@@ -21,16 +25,107 @@ class NKLandscape:
     N: int
     K: int
     dependencies: List[List[int]]
-    tables: List[np.ndarray]
+    tables: Sequence[np.ndarray]
     skill_profile: Optional[SkillProfile] = None
     bit_skills: Optional[Dict[int, str]] = None
     conflict_pairs: Optional[ConflictPairs] = None
+    _dep_index: np.ndarray = field(init=False, repr=False, compare=False)
+    _shift_weights: np.ndarray = field(init=False, repr=False, compare=False)
+    _table_matrix: Optional[np.ndarray] = field(init=False, repr=False, compare=False)
+    _bit_rows: np.ndarray = field(init=False, repr=False, compare=False)
+    _rev_ptr: np.ndarray = field(init=False, repr=False, compare=False)
+    _rev_rows: np.ndarray = field(init=False, repr=False, compare=False)
+    _rev_weights: np.ndarray = field(init=False, repr=False, compare=False)
+    _rev_pad_rows: np.ndarray = field(init=False, repr=False, compare=False)
+    _rev_pad_weights: np.ndarray = field(init=False, repr=False, compare=False)
+    _dep_word: np.ndarray = field(init=False, repr=False, compare=False)
+    _dep_offset: np.ndarray = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if len(self.dependencies) != self.N:
             raise ValueError("dependencies must have length N")
         if len(self.tables) != self.N:
             raise ValueError("tables must have length N")
+        self._compile_layout()
+
+    def _compile_layout(self) -> None:
+        """Precompile dependencies/tables into dense arrays for vectorized lookup.
+
+        Row ``i`` of ``_dep_index`` lists ``[i, *dependencies[i]]`` (the same bit
+        order as the pattern index), ``_shift_weights`` holds the matching powers of
+        two and ``_table_matrix`` stacks all contribution tables. Rows are padded
+        with zero weights when dependency lists have different lengths. A 2-D
+        ``tables`` array (e.g. a memmap from the landscape store) is used as the
+        table matrix without copying. :class:`ProceduralTables` keep no matrix at
+        all (``_table_matrix`` is None) and are looked up through :meth:`_lookup`.
+        """
+
+        widths = [len(deps) + 1 for deps in self.dependencies]
+        width = max(widths, default=1)
+        dep_index = np.zeros((self.N, width), dtype=np.intp)
+        shift_weights = np.zeros((self.N, width), dtype=np.int64)
+        procedural = isinstance(self.tables, ProceduralTables)
+        prebuilt = procedural or (
+            isinstance(self.tables, np.ndarray)
+            and self.tables.shape == (self.N, 2**width)
+            and min(widths, default=width) == width
+        )
+        if procedural:
+            table_matrix = None
+        elif prebuilt:
+            table_matrix = self.tables
+        else:
+            table_matrix = np.zeros((self.N, 2**width), dtype=float)
+        for idx, deps in enumerate(self.dependencies):
+            local_bits = [idx, *deps]
+            local_width = len(local_bits)
+            dep_index[idx, :local_width] = local_bits
+            shift_weights[idx, :local_width] = 1 << np.arange(local_width - 1, -1, -1)
+            if prebuilt:
+                continue
+            table = np.asarray(self.tables[idx], dtype=float)
+            if table.size != 2**local_width:
+                raise ValueError(f"table for bit {idx} must have 2**{local_width} entries")
+            table_matrix[idx, : table.size] = table
+        self._dep_index = dep_index
+        self._shift_weights = shift_weights
+        self._table_matrix = table_matrix
+        self._bit_rows = np.arange(self.N)
+        # パック表現用: 依存ビットが入っている word 番号と word 内シフト量
+        self._dep_word = dep_index // WORD_BITS
+        self._dep_offset = (dep_index % WORD_BITS).astype(PACKED_DTYPE)
+        self._compile_reverse_index()
+
+    def _compile_reverse_index(self) -> None:
+        """Build a CSR index from each bit to the contributions that read it.
+
+        ``_rev_rows[_rev_ptr[b]:_rev_ptr[b + 1]]`` are the bits ``j`` whose local
+        pattern contains ``b`` (``j == b`` included) and ``_rev_weights`` holds the
+        pattern-index weight of ``b`` inside row ``j``, so flipping ``b`` maps the
+        pattern index of row ``j`` to ``index ^ weight``. ``_rev_pad_*`` hold the
+        same index as an (N, R) matrix for batched flips; short rows are padded by
+        repeating their first entry (the bit itself), which is harmless to rewrite.
+        """
+
+        reverse: List[List[Tuple[int, int]]] = [[] for _ in range(self.N)]
+        for row in range(self.N):
+            for pos, bit in enumerate([row, *self.dependencies[row]]):
+                reverse[int(bit)].append((row, int(self._shift_weights[row, pos])))
+        counts = [len(entries) for entries in reverse]
+        self._rev_ptr = np.concatenate(([0], np.cumsum(counts))).astype(np.intp)
+        self._rev_rows = np.array(
+            [row for entries in reverse for row, _ in entries], dtype=np.intp
+        )
+        self._rev_weights = np.array(
+            [weight for entries in reverse for _, weight in entries], dtype=np.int64
+        )
+        max_count = max(counts, default=1)
+        self._rev_pad_rows = np.zeros((self.N, max_count), dtype=np.intp)
+        self._rev_pad_weights = np.zeros((self.N, max_count), dtype=np.int64)
+        for bit, entries in enumerate(reverse):
+            padded = entries + [entries[0]] * (max_count - len(entries))
+            self._rev_pad_rows[bit] = [row for row, _ in padded]
+            self._rev_pad_weights[bit] = [weight for _, weight in padded]
 
     @classmethod
     def from_random(
@@ -42,7 +137,16 @@ class NKLandscape:
         skill_profile: Optional[SkillProfile] = None,
         bit_skills: Optional[Dict[int, str]] = None,
         conflict_pairs: Optional[Iterable[Tuple[int, int]]] = None,
+        legacy_table_generation: bool = False,
     ) -> "NKLandscape":
+        """Sample dependencies and contribution tables.
+
+        Tables are drawn with one bulk ``rng.uniform`` call per bit, which consumes
+        the generator exactly like the historical per-pattern draws, so existing
+        seeds give the same landscape. ``legacy_table_generation=True`` keeps the
+        original per-pattern loop for cross-checking.
+        """
+
         rng = np.random.default_rng(seed)
         deps = dependencies or cls._generate_dependencies(N, K, rng)
         tables = []
@@ -51,8 +155,9 @@ class NKLandscape:
             normalized_conflicts = {
                 tuple(sorted(pair)) for pair in conflict_pairs if pair[0] != pair[1]
             }
+        generate_table = cls._generate_table_legacy if legacy_table_generation else cls._generate_table
         for bit_idx in range(N):
-            table = cls._generate_table(
+            table = generate_table(
                 bit_idx,
                 deps[bit_idx],
                 K,
@@ -72,6 +177,54 @@ class NKLandscape:
             conflict_pairs=normalized_conflicts,
         )
 
+    @classmethod
+    def from_procedural(
+        cls,
+        N: int,
+        K: int,
+        seed: Optional[int] = None,
+        dependencies: Optional[List[List[int]]] = None,
+        skill_profile: Optional[SkillProfile] = None,
+        bit_skills: Optional[Dict[int, str]] = None,
+        conflict_pairs: Optional[Iterable[Tuple[int, int]]] = None,
+    ) -> "NKLandscape":
+        """Like :meth:`from_random` but with hash-based :class:`ProceduralTables`.
+
+        Contributions are computed on demand from ``(seed, bit, pattern)``, so K is
+        no longer limited by the 2^(K+1) table size. Values follow the same
+        distribution as :meth:`from_random` but are not the same numbers.
+        """
+
+        rng = np.random.default_rng(seed)
+        deps = dependencies or cls._generate_dependencies(N, K, rng)
+        normalized_conflicts: Optional[ConflictPairs] = None
+        if conflict_pairs:
+            normalized_conflicts = {
+                tuple(sorted(pair)) for pair in conflict_pairs if pair[0] != pair[1]
+            }
+        tables = ProceduralTables(
+            seed=int(rng.integers(0, 2**63)),
+            widths=[len(deps[bit_idx]) + 1 for bit_idx in range(N)],
+            ranges=[cls._skill_range(bit_idx, skill_profile, bit_skills) for bit_idx in range(N)],
+            conflict_masks=[
+                ProceduralTables.conflict_masks_for([bit_idx, *deps[bit_idx]], normalized_conflicts)
+                for bit_idx in range(N)
+            ],
+        )
+        return cls(
+            N=N,
+            K=K,
+            dependencies=deps,
+            tables=tables,
+            skill_profile=skill_profile,
+            bit_skills=bit_skills,
+            conflict_pairs=normalized_conflicts,
+        )
+
+    @property
+    def is_procedural(self) -> bool:
+        return self._table_matrix is None
+
     @staticmethod
     def _generate_dependencies(N: int, K: int, rng: np.random.Generator) -> List[List[int]]:
         deps: List[List[int]] = []
@@ -92,6 +245,44 @@ class NKLandscape:
         skill_profile: Optional[SkillProfile],
         bit_skills: Optional[Dict[int, str]],
         conflict_pairs: Optional[ConflictPairs],
+    ) -> np.ndarray:
+        width = K + 1
+        low, high = cls._skill_range(bit_idx, skill_profile, bit_skills)
+        table = rng.uniform(low, high, size=2**width)
+        conflict = cls._conflict_mask([bit_idx, *dep_list], width, conflict_pairs)
+        table[conflict] *= 0.5  # penalize conflicting combinations
+        return table
+
+    @staticmethod
+    def _conflict_mask(
+        local_bits: Sequence[int],
+        width: int,
+        conflict_pairs: Optional[ConflictPairs],
+    ) -> np.ndarray:
+        """Boolean mask over pattern indices where some conflict pair is (1, 1)."""
+
+        patterns = np.arange(2**width)
+        mask = np.zeros(patterns.size, dtype=bool)
+        if not conflict_pairs:
+            return mask
+        # パターン index の MSB が local_bits[0] に対応する（_bits_from_int と同じ並び）
+        positions = {bit: pos for pos, bit in enumerate(local_bits[:width])}
+        for a, b in conflict_pairs:
+            if a in positions and b in positions:
+                pair_bits = (1 << (width - 1 - positions[a])) | (1 << (width - 1 - positions[b]))
+                mask |= (patterns & pair_bits) == pair_bits
+        return mask
+
+    @classmethod
+    def _generate_table_legacy(
+        cls,
+        bit_idx: int,
+        dep_list: Sequence[int],
+        K: int,
+        rng: np.random.Generator,
+        skill_profile: Optional[SkillProfile],
+        bit_skills: Optional[Dict[int, str]],
+        conflict_pairs: Optional[ConflictPairs],
     ) -> np.ndarray:
         width = K + 1
         table = np.zeros(2**width, dtype=float)
@@ -135,24 +326,200 @@ class NKLandscape:
         return False
 
     def evaluate(self, state: np.ndarray) -> float:
-        if len(state) != self.N:
+        state = np.asarray(state)
+        if state.shape != (self.N,):
+            raise ValueError("state length must equal N")
+        return float(self.evaluate_many(state[np.newaxis, :])[0])
+
+    def evaluate_many(self, states: np.ndarray) -> np.ndarray:
+        """Evaluate an (M, N) matrix of 0/1 states and return M fitness values."""
+
+        states = np.asarray(states)
+        if states.ndim != 2 or states.shape[1] != self.N:
+            raise ValueError("states must have shape (M, N)")
+        return self._fitness_from_contributions(self._contributions(states))
+
+    def evaluate_packed(self, packed: np.ndarray) -> np.ndarray | float:
+        """Evaluate packed states (see :mod:`cmis_nk.packed`).
+
+        ``packed`` has shape (W,) for one state or (M, W) for a batch, with
+        ``W = word_count(N)``. Pattern indices are extracted with shifts and masks
+        directly from the words, without unpacking to int8.
+        """
+
+        packed = np.asarray(packed, dtype=PACKED_DTYPE)
+        if packed.shape[-1] != word_count(self.N) or packed.ndim not in (1, 2):
+            raise ValueError("packed states must have shape (W,) or (M, W)")
+        batch = packed.reshape(-1, packed.shape[-1])
+        words = batch[:, self._dep_word]
+        local_bits = ((words >> self._dep_offset) & PACKED_DTYPE(1)).astype(np.int64)
+        patterns = (local_bits * self._shift_weights).sum(axis=-1)
+        fitness = self._fitness_from_contributions(self._lookup(self._bit_rows, patterns))
+        return float(fitness[0]) if packed.ndim == 1 else fitness
+
+    def contributions(self, state: np.ndarray) -> np.ndarray:
+        """Return the per-bit contributions ``f_i`` of ``state`` (length N)."""
+
+        state = np.asarray(state)
+        if state.shape != (self.N,):
+            raise ValueError("state length must equal N")
+        return self._contributions(state[np.newaxis, :])[0]
+
+    def flip_delta(
+        self,
+        state: np.ndarray,
+        contributions: np.ndarray,
+        bit: int,
+    ) -> Tuple[float, np.ndarray]:
+        """Return fitness and contributions after flipping ``bit`` of ``state``.
+
+        ``contributions`` must be the per-bit contributions of ``state`` (see
+        :meth:`contributions`). Only the rows listed in the reverse-dependency
+        index are looked up again; ``state`` and ``contributions`` are left intact.
+        """
+
+        lo, hi = self._rev_ptr[bit], self._rev_ptr[bit + 1]
+        rows = self._rev_rows[lo:hi]
+        local_bits = np.asarray(state)[self._dep_index[rows]].astype(np.int64)
+        patterns = (local_bits * self._shift_weights[rows]).sum(axis=-1)
+        new_contributions = np.array(contributions, dtype=float)
+        new_contributions[rows] = self._lookup(rows, patterns ^ self._rev_weights[lo:hi])
+        return float(self._fitness_from_contributions(new_contributions)), new_contributions
+
+    def flip_delta_many(
+        self,
+        states: np.ndarray,
+        contributions: np.ndarray,
+        bits: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched :meth:`flip_delta`: flip ``bits[m]`` in row ``m`` of ``states``.
+
+        Returns the (M,) fitness values and the (M, N) updated contributions; the
+        inputs are not modified.
+        """
+
+        states = np.asarray(states)
+        bits = np.asarray(bits, dtype=np.intp)
+        rows = self._rev_pad_rows[bits]
+        batch = np.arange(len(bits))[:, np.newaxis]
+        local_bits = states[batch[:, :, np.newaxis], self._dep_index[rows]].astype(np.int64)
+        patterns = (local_bits * self._shift_weights[rows]).sum(axis=-1)
+        new_contributions = np.array(contributions, dtype=float)
+        new_contributions[batch, rows] = self._lookup(rows, patterns ^ self._rev_pad_weights[bits])
+        return self._fitness_from_contributions(new_contributions), new_contributions
+
+    def coupled_bits(self, bit: int) -> np.ndarray:
+        """Bits whose one-flip delta can change when ``bit`` is flipped.
+
+        These are all bits read by a contribution that also reads ``bit``
+        (``bit`` itself included), i.e. the entries of :meth:`neighborhood_deltas_many`
+        that must be refreshed after a move.
+        """
+
+        lo, hi = self._rev_ptr[bit], self._rev_ptr[bit + 1]
+        return np.unique(self._dep_index[self._rev_rows[lo:hi]])
+
+    def neighborhood_fitness(
+        self,
+        state: np.ndarray,
+        bit_indices: Optional[Sequence[int]] = None,
+        contributions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """Fitness of every one-bit neighbor of ``state`` (one value per bit index).
+
+        No neighbor states are materialized: each value is ``F(state)`` plus the
+        change of the contributions that read the flipped bit. Pass the state's
+        ``contributions`` when already known to skip recomputing them.
+        """
+
+        state = np.asarray(state)
+        if state.shape != (self.N,):
             raise ValueError("state length must equal N")
-        total = 0.0
-        for idx in range(self.N):
-            local_bits = [idx, *self.dependencies[idx]]
-            positions = [state[bit] for bit in local_bits]
-            pattern_index = 0
-            for bit_val in positions:
-                pattern_index = (pattern_index << 1) | int(bit_val)
-            total += self.tables[idx][pattern_index]
-        return total / self.N
+        batch_contributions = None if contributions is None else np.asarray(contributions)[np.newaxis, :]
+        return self.neighborhood_fitness_many(state[np.newaxis, :], bit_indices, batch_contributions)[0]
+
+    def neighborhood_fitness_many(
+        self,
+        states: np.ndarray,
+        bit_indices: Optional[Sequence[int]] = None,
+        contributions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """(M, B) neighbor fitness matrix for an (M, N) batch of states."""
+
+        states = np.asarray(states)
+        if contributions is None:
+            contributions = self._contributions(states)
+        deltas = self.neighborhood_deltas_many(states, bit_indices, contributions)
+        return self._fitness_from_contributions(contributions)[:, np.newaxis] + deltas
+
+    def neighborhood_deltas_many(
+        self,
+        states: np.ndarray,
+        bit_indices: Optional[Sequence[int]] = None,
+        contributions: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """(M, B) matrix of ``F(flip_b(x)) - F(x)`` using the reverse-dependency index."""
+
+        states = np.asarray(states)
+        if states.ndim != 2 or states.shape[1] != self.N:
+            raise ValueError("states must have shape (M, N)")
+        if contributions is None:
+            contributions = self._contributions(states)
+        bits = (
+            np.arange(self.N, dtype=np.intp)
+            if bit_indices is None
+            else np.asarray(bit_indices, dtype=np.intp).reshape(-1)
+        )
+        if bits.size == 0:
+            return np.zeros((states.shape[0], 0))
+        # 対象ビットの CSR 区間を連結し、区間ごとの差分を reduceat で合計する
+        starts = self._rev_ptr[bits]
+        counts = self._rev_ptr[bits + 1] - starts
+        segment_ptr = np.concatenate(([0], np.cumsum(counts)))
+        positions = np.repeat(starts - segment_ptr[:-1], counts) + np.arange(segment_ptr[-1])
+        rows = self._rev_rows[positions]
+        patterns = self._pattern_indices(states)[:, rows] ^ self._rev_weights[positions]
+        diffs = self._lookup(rows, patterns) - contributions[:, rows]
+        return np.add.reduceat(diffs, segment_ptr[:-1], axis=1) / self.N
+
+    def _pattern_indices(self, states: np.ndarray) -> np.ndarray:
+        # (..., N, K+1) の局所ビットに重みを掛けて各ビットのテーブル index を一括計算
+        local_bits = states[..., self._dep_index].astype(np.int64)
+        return (local_bits * self._shift_weights).sum(axis=-1)
+
+    def _lookup(self, rows: np.ndarray, patterns: np.ndarray) -> np.ndarray:
+        # 全カーネルの共通入口: 密な行列か procedural なハッシュかをここで切り替える
+        if self._table_matrix is None:
+            return self.tables.lookup(rows, patterns)
+        return self._table_matrix[rows, patterns]
+
+    def _contributions(self, states: np.ndarray) -> np.ndarray:
+        return self._lookup(self._bit_rows, self._pattern_indices(states))
+
+    def _fitness_from_contributions(self, contributions: np.ndarray) -> np.ndarray:
+        # cumsum は先頭ビットから逐次加算するため、バッチ形状によらず同じ丸め結果になる
+        return np.cumsum(contributions, axis=-1)[..., -1] / self.N
+
+    def enumerate_all(self, path: Optional[str] = None, block_bits: int = 16) -> np.memmap:
+        """Write the fitness of all 2^N states to a float32 memmap (Gray-code sweep).
+
+        Use :func:`cmis_nk.enumeration.summarize_fitness` on the result for the
+        global optimum, local-optima count and histogram. A given ``path`` is kept
+        for the caller; without one the backing temporary file is already unlinked.
+        """
+
+        return enumerate_fitness(self, path=path, block_bits=block_bits)
 
     def random_state(self, rng: Optional[np.random.Generator] = None) -> np.ndarray:
         generator = rng or np.random.default_rng()
         return generator.integers(0, 2, size=self.N, dtype=np.int8)
 
     def neighbors(self, state: np.ndarray, bit_indices: Sequence[int]) -> List[np.ndarray]:
-        """Return one-bit neighbors limited to given bit indices."""
+        """Return one-bit neighbors limited to given bit indices.
+
+        Prefer :meth:`neighborhood_fitness` when only the neighbors' fitness is
+        needed; it avoids one state copy and one full evaluation per neighbor.
+        """
         neighbors = []
         for bit in bit_indices:
             new_state = state.copy()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import numpy as np
+
+from .landscape import NKLandscape
+
+
+STORE_FORMAT_VERSION = 1
+
+
+def landscape_hash(params: Mapping[str, Any]) -> str:
+    """Stable SHA-256 of the landscape-generating parameters."""
+
+    payload = json.dumps(
+        {"format": STORE_FORMAT_VERSION, **params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def landscape_fingerprint(landscape: NKLandscape) -> str:
+    """SHA-256 of a landscape's content (dependencies, biases and contribution values).
+
+    Unlike :func:`landscape_hash` this identifies the landscape itself, however
+    it was built. Procedural tables are identified by their seed, which together
+    with the other fields determines every value.
+    """
+
+    meta = {
+        "format": STORE_FORMAT_VERSION,
+        "N": landscape.N,
+        "K": landscape.K,
+        "dependencies": [[int(bit) for bit in deps] for deps in landscape.dependencies],
+        "skill_profile": landscape.skill_profile,
+        "bit_skills": landscape.bit_skills,
+        "conflict_pairs": sorted(landscape.conflict_pairs) if landscape.conflict_pairs else None,
+        "procedural_seed": landscape.tables.seed if landscape.is_procedural else None,
+    }
+    digest = hashlib.sha256(json.dumps(meta, sort_keys=True, default=str).encode("utf-8"))
+    if not landscape.is_procedural:
+        digest.update(np.ascontiguousarray(landscape._table_matrix, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+class LandscapeStore:
+    """Content-addressed on-disk cache of generated NK landscapes.
+
+    Each entry lives under ``<cache_dir>/<hash>/`` as ``dependencies.npy`` and
+    ``tables.npy`` plus ``meta.json``. Hits are loaded with ``mmap_mode="r"`` so the
+    table matrix is shared with the page cache instead of being copied.
+    """
+
+    def __init__(self, cache_dir: str | Path) -> None:
+        self.cache_dir = Path(cache_dir)
+
+    def entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def load(self, key: str) -> Optional[NKLandscape]:
+        entry = self.entry_dir(key)
+        meta_path = entry / "meta.json"
+        if not meta_path.exists():
+            return None
+        with meta_path.open("r", encoding="utf-8") as handle:
+            meta = json.load(handle)
+        dep_matrix = np.load(entry / "dependencies.npy")
+        tables = np.load(entry / "tables.npy", mmap_mode="r")
+        skill_profile = meta.get("skill_profile")
+        bit_skills = meta.get("bit_skills")
+        conflict_pairs = meta.get("conflict_pairs")
+        return NKLandscape(
+            N=int(meta["N"]),
+            K=int(meta["K"]),
+            dependencies=[[int(bit) for bit in row] for row in dep_matrix],
+            tables=tables,
+            skill_profile=(
+                {name: tuple(bounds) for name, bounds in skill_profile.items()}
+                if skill_profile is not None
+                else None
+            ),
+            bit_skills=(
+                {int(bit): skill for bit, skill in bit_skills.items()}
+                if bit_skills is not None
+                else None
+            ),
+            conflict_pairs=(
+                {tuple(pair) for pair in conflict_pairs} if conflict_pairs is not None else None
+            ),
+        )
+
+    def save(self, key: str, landscape: NKLandscape, params: Mapping[str, Any]) -> Path:
+        if landscape.is_procedural:
+            raise ValueError("procedural landscapes have no table matrix to store")
+        widths = {len(deps) for deps in landscape.dependencies}
+        if len(widths) > 1:
+            raise ValueError("landscape store requires dependency lists of equal length")
+        dep_matrix = np.asarray(landscape.dependencies, dtype=np.int64).reshape(
+            landscape.N, widths.pop() if widths else 0
+        )
+        entry = self.entry_dir(key)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 一時ディレクトリに書いてから rename し、途中で落ちても壊れたエントリを残さない
+        staging = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir))
+        try:
+            np.save(staging / "dependencies.npy", dep_matrix)
+            np.save(staging / "tables.npy", np.ascontiguousarray(landscape._table_matrix))
+            meta: Dict[str, Any] = {
+                "N": landscape.N,
+                "K": landscape.K,
+                "params": dict(params),
+                "skill_profile": (
+                    {name: list(bounds) for name, bounds in landscape.skill_profile.items()}
+                    if landscape.skill_profile is not None
+                    else None
+                ),
+                "bit_skills": (
+                    {str(bit): skill for bit, skill in landscape.bit_skills.items()}
+                    if landscape.bit_skills is not None
+                    else None
+                ),
+                "conflict_pairs": (
+                    sorted(list(pair) for pair in landscape.conflict_pairs)
+                    if landscape.conflict_pairs is not None
+                    else None
+                ),
+            }
+            with (staging / "meta.json").open("w", encoding="utf-8") as handle:
+                json.dump(meta, handle, ensure_ascii=False, indent=2, default=str)
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # 別プロセスが同じキーを先に保存した場合はそちらを使う
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return entry
+
+    def get_or_build(
+        self,
+        params: Mapping[str, Any],
+        factory: Callable[[], NKLandscape],
+    ) -> NKLandscape:
+        key = landscape_hash(params)
+        cached = self.load(key)
+        if cached is not None:
+            return cached
+        landscape = factory()
+        self.save(key, landscape, params)
+        return self.load(key) or landscape
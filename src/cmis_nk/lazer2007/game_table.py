@@ -1,16 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from itertools import combinations
-from typing import Iterable, List, Optional, Protocol, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
 
 import networkx as nx
 import numpy as np
 import pandas as pd
 
 from ..agents import Agent
+from ..common.adaptive import AdaptiveSampling, sample_adaptively
 from ..common.game_types import GameTableRecord
+from ..common.history import HistoryLevel
+from ..common.seeding import root_entropy, spawn_seed
+from ..fitness_cache import FitnessCache
+from ..landscape import NKLandscape
+from ..landscape_store import landscape_fingerprint
+from ..networks import CompiledGraph
+from ..result_store import CoalitionResultStore, coalition_mask, config_hash
+from ..shared_landscape import SharedLandscape, SharedLandscapeHandle, attach_landscape
 from ..simulation import SimulationConfig, SimulationEngine, SimulationResult
+from ..simulation_array import ArraySimulationEngine
 
 
 class GameValueProtocol(Protocol):
@@ -24,8 +35,182 @@ class AverageFinalScoreProtocol(GameValueProtocol):
         return float(np.mean(scores)) if scores else 0.0
 
 
+# (mean, std, runs, notes suffix)
+CoalitionOutcome = Tuple[float, float, int, str]
+# (成分のメンバービットマスク, エージェント index, run 数)
+ComponentTask = Tuple[int, Tuple[int, ...], int]
+
+
+@dataclass
+class _CoalitionSimulator:
+    """Everything needed to simulate coalitions; sent once to each worker process.
+
+    Run ``r`` of coalition ``i`` uses ``spawn_seed(entropy, i, r)`` (with
+    ``decompose``, run ``r`` of a component uses ``spawn_seed(entropy, mask, r)``),
+    so outcomes do not depend on evaluation order or on the worker count.
+    """
+
+    landscape: Optional[NKLandscape]  # ワーカーへ送る間は None（共有メモリから復元する）
+    agents: List[Agent]
+    graph: CompiledGraph
+    sim_config: SimulationConfig
+    protocol: GameValueProtocol
+    entropy: int
+    runs: int
+    adaptive: Optional[AdaptiveSampling] = None
+    fitness_cache: Optional[FitnessCache] = None
+    decompose: bool = False
+    component_runs: Dict[int, List[SimulationResult]] = field(default_factory=dict)
+
+    def evaluate(self, coalition_index: int, coalition_ids: Sequence[int]) -> CoalitionOutcome:
+        coalition_agents = [self.agents[i] for i in coalition_ids]
+        subgraph = self.graph.induced([agent.agent_id for agent in coalition_agents])
+        notes: List[str] = []
+        if self.decompose:
+            components = self.components(coalition_ids, subgraph)
+            sample = self._component_sampler(coalition_agents, components)
+            notes.append(f"components={len(components)}")
+        else:
+            sample = self._coalition_sampler(coalition_index, coalition_agents, subgraph)
+        if self.adaptive is not None:
+            stats = sample_adaptively(sample, self.adaptive)
+            notes.append(self.adaptive.note())
+            return stats.mean, stats.std, stats.count, ";".join(notes)
+        values = sample(self.runs)
+        return float(np.mean(values)), float(np.std(values)), self.runs, ";".join(notes)
+
+    def components(
+        self,
+        coalition_ids: Sequence[int],
+        subgraph: CompiledGraph,
+    ) -> List[Tuple[int, List[Agent]]]:
+        """Connected components of the coalition as (member bitmask, agents in coalition order)."""
+
+        position = {self.agents[idx].agent_id: idx for idx in coalition_ids}
+        components: List[Tuple[int, List[Agent]]] = []
+        for component in subgraph.component_masks():
+            members = sorted(position[node] for node in subgraph.node_ids(component))
+            mask = sum(1 << idx for idx in members)
+            components.append((mask, [self.agents[idx] for idx in members]))
+        components.sort(key=lambda item: item[0])
+        return components
+
+    def component_results(self, mask: int, agents: List[Agent], count: int) -> List[SimulationResult]:
+        """First ``count`` runs of one component, simulating only the runs not cached yet."""
+
+        cached = self.component_runs.setdefault(mask, [])
+        if len(cached) < count:
+            graph = self.graph.induced([agent.agent_id for agent in agents])
+            seeds = [spawn_seed(self.entropy, mask, run) for run in range(len(cached), count)]
+            cached.extend(self._run_engines(agents, graph, seeds))
+        return cached
+
+    def _coalition_sampler(
+        self,
+        coalition_index: int,
+        coalition_agents: List[Agent],
+        subgraph: CompiledGraph,
+    ) -> Callable[[int], List[float]]:
+        drawn = 0
+
+        def sample(count: int) -> List[float]:
+            nonlocal drawn
+            seeds = [spawn_seed(self.entropy, coalition_index, run) for run in range(drawn, drawn + count)]
+            drawn += count
+            results = self._run_engines(coalition_agents, subgraph, seeds)
+            return [self.protocol.evaluate(result, coalition_agents) for result in results]
+
+        return sample
+
+    def _component_sampler(
+        self,
+        coalition_agents: List[Agent],
+        components: List[Tuple[int, List[Agent]]],
+    ) -> Callable[[int], List[float]]:
+        """``sample(count)`` that assembles the next ``count`` runs from cached component runs."""
+
+        drawn = 0
+
+        def sample(count: int) -> List[float]:
+            nonlocal drawn
+            stop = drawn + count
+            parts = [self.component_results(mask, agents, stop) for mask, agents in components]
+            values = [
+                self.protocol.evaluate(_merge_results([runs[run] for runs in parts]), coalition_agents)
+                for run in range(drawn, stop)
+            ]
+            drawn = stop
+            return values
+
+        return sample
+
+    def _run_engines(
+        self,
+        agents: List[Agent],
+        graph: CompiledGraph,
+        seeds: Sequence[int],
+    ) -> List[SimulationResult]:
+        assert self.landscape is not None
+        if self.sim_config.backend == "array":
+            # 全 run を (R, A, N) テンソルで同時に回す（run ごとの結果は逐次版と同じ）
+            return ArraySimulationEngine(
+                landscape=self.landscape,
+                agents=agents,
+                graph=graph,
+                config=self.sim_config,
+                fitness_cache=self.fitness_cache,
+                rng_seeds=seeds,
+            ).run_batch()
+        return [
+            SimulationEngine(
+                landscape=self.landscape,
+                agents=agents,
+                graph=graph,
+                config=replace(self.sim_config, rng_seed=seed),
+                fitness_cache=self.fitness_cache,
+            ).run()
+            for seed in seeds
+        ]
+
+
+_WORKER_SIMULATOR: Optional[_CoalitionSimulator] = None
+_WORKER_BLOCK = None  # 共有メモリのブロックは景観を使う間保持しておく
+
+
+def _init_worker(
+    simulator: _CoalitionSimulator,
+    landscape: NKLandscape | SharedLandscapeHandle,
+    cache_capacity: Optional[int],
+) -> None:
+    global _WORKER_SIMULATOR, _WORKER_BLOCK
+    simulator.landscape, _WORKER_BLOCK = attach_landscape(landscape)
+    if cache_capacity:
+        simulator.fitness_cache = FitnessCache(simulator.landscape, capacity=cache_capacity)
+    _WORKER_SIMULATOR = simulator
+
+
+def _evaluate_in_worker(task: Tuple[int, Tuple[int, ...]]) -> CoalitionOutcome:
+    assert _WORKER_SIMULATOR is not None
+    return _WORKER_SIMULATOR.evaluate(*task)
+
+
+def _component_in_worker(task: ComponentTask) -> List[SimulationResult]:
+    assert _WORKER_SIMULATOR is not None
+    mask, members, count = task
+    agents = [_WORKER_SIMULATOR.agents[idx] for idx in members]
+    _WORKER_SIMULATOR.component_results(mask, agents, count)
+    # 結果は親プロセスのキャッシュに移すので、ワーカー側には残さない
+    return _WORKER_SIMULATOR.component_runs.pop(mask)
+
+
 class GameTableBuilder:
-    """Generate cooperative game tables from coalition simulations (Lazer2007-style)."""
+    """Generate cooperative game tables from coalition simulations (Lazer2007-style).
+
+    With ``workers > 1`` coalitions (or, with ``decompose``, distinct components)
+    are simulated on a process pool. The landscape's table matrix is published
+    once through shared memory and every run has a seed keyed by
+    (coalition, run), so the table is identical for any worker count.
+    """
 
     def __init__(
         self,
@@ -37,67 +222,198 @@ class GameTableBuilder:
         protocol: Optional[GameValueProtocol] = None,
         rng_seed: Optional[int] = None,
         notes: Optional[str] = None,
+        fitness_cache: Optional[FitnessCache] = None,
+        adaptive: Optional[AdaptiveSampling] = None,
+        history: HistoryLevel = "none",
+        decompose: bool = False,
+        workers: Optional[int] = None,
+        result_store: Optional[CoalitionResultStore] = None,
+        resume: bool = False,
     ) -> None:
         self.landscape = landscape
         self.agents = agents
         self.base_graph = base_graph
-        self.sim_config = sim_config
+        # 提携ごとの誘導部分グラフは近傍ビットマスクのマスクで作る（networkx の subgraph().copy() を避ける）
+        self.graph = CompiledGraph.from_networkx(base_graph)
+        # 既定のプロトコルは最終スコアしか使わないため、テーブル構築中は履歴を記録しない
+        self.sim_config = replace(sim_config, history=history)
         self.runs = runs
         self.protocol = protocol or AverageFinalScoreProtocol()
-        self.rng = np.random.default_rng(rng_seed)
+        self.entropy = root_entropy(rng_seed)
         self.base_notes = notes or ""
+        self.fitness_cache = fitness_cache
+        # 指定時は runs の代わりに信頼区間の半幅で提携ごとの run 数を決める
+        self.adaptive = adaptive
+        # 提携サブグラフを連結成分に分け、成分ごとの run 結果を使い回す。
+        # 成分の run の seed はメンバー集合（ビットマスク）と run 番号だけで決まる
+        self.decompose = decompose
+        self.workers = workers
+        # 完了した提携の結果を永続化し、resume 時は保存済みの提携を計算し直さない
+        self.result_store = result_store
+        self.resume = resume
         self.records: List[GameTableRecord] = []
 
     def build_table(self, max_size: Optional[int] = None) -> pd.DataFrame:
         self.records.clear()
-        coalition_index = 0
-        for coalition_ids in self._enumerate_coalitions(max_size=max_size):
-            coalition_agents = [self.agents[i] for i in coalition_ids]
-            member_labels = tuple(agent.player_id for agent in coalition_agents)
-            if not coalition_agents:
-                notes = (self.base_notes + ";empty coalition") if self.base_notes else "empty coalition"
-                self.records.append(
-                    GameTableRecord(
-                        coalition_id=coalition_index,
-                        members=member_labels,
-                        size=0,
-                        mean_value=0.0,
-                        std_value=0.0,
-                        runs=0,
-                        notes=notes,
-                    )
-                )
-                coalition_index += 1
-                continue
-            values: List[float] = []
-            subgraph = self.base_graph.subgraph([agent.agent_id for agent in coalition_agents]).copy()
-            for _ in range(self.runs):
-                cfg = replace(self.sim_config, rng_seed=int(self.rng.integers(0, 1_000_000_000)))
-                engine = SimulationEngine(
-                    landscape=self.landscape,
-                    agents=coalition_agents,
-                    graph=subgraph,
-                    config=cfg,
-                )
-                result = engine.run()
-                values.append(self.protocol.evaluate(result, coalition_agents))
-            mean_value = float(np.mean(values))
-            std_value = float(np.std(values))
-            notes = self.base_notes
+        coalitions = list(self._enumerate_coalitions(max_size=max_size))
+        tasks = [(index, coalition_ids) for index, coalition_ids in enumerate(coalitions) if coalition_ids]
+        simulator = _CoalitionSimulator(
+            landscape=self.landscape,
+            agents=self.agents,
+            graph=self.graph,
+            sim_config=self.sim_config,
+            protocol=self.protocol,
+            entropy=self.entropy,
+            runs=self.runs,
+            adaptive=self.adaptive,
+            fitness_cache=self.fitness_cache,
+            decompose=self.decompose,
+        )
+        outcome_by_index: Dict[int, CoalitionOutcome] = {}
+        store_keys = self._store_keys() if self.result_store is not None else None
+        if store_keys is not None and self.resume:
+            stored = self.result_store.load(*store_keys)
+            for index, coalition_ids in tasks:
+                outcome = stored.get((coalition_mask(coalition_ids), self._seed_key(index)))
+                if outcome is not None:
+                    outcome_by_index[index] = outcome
+        pending = [task for task in tasks if task[0] not in outcome_by_index]
+        finished: Iterable[Tuple[Tuple[int, Tuple[int, ...]], CoalitionOutcome]]
+        if self.decompose:
+            # 成分単位で（並列に）計算し、提携の値は手元で組み立てる
+            finished = self._iter_decomposed(simulator, pending)
+        else:
+            finished = zip(pending, self._iter_pool(simulator, _evaluate_in_worker, pending, simulator.evaluate))
+        for (index, coalition_ids), outcome in finished:
+            outcome_by_index[index] = outcome
+            if store_keys is not None:
+                self.result_store.put(*store_keys, coalition_mask(coalition_ids), self._seed_key(index), outcome)
+        if self.result_store is not None:
+            self.result_store.flush()
+        for coalition_index, coalition_ids in enumerate(coalitions):
+            member_labels = tuple(self.agents[i].player_id for i in coalition_ids)
+            if not coalition_ids:
+                mean_value, std_value, runs, note = 0.0, 0.0, 0, "empty coalition"
+            else:
+                mean_value, std_value, runs, note = outcome_by_index[coalition_index]
             self.records.append(
                 GameTableRecord(
                     coalition_id=coalition_index,
                     members=member_labels,
-                    size=len(coalition_agents),
+                    size=len(coalition_ids),
                     mean_value=mean_value,
                     std_value=std_value,
-                    runs=self.runs,
-                    notes=notes,
+                    runs=runs,
+                    notes=";".join(part for part in (self.base_notes, note) if part),
                 )
             )
-            coalition_index += 1
         return self.to_dataframe()
 
+    def _iter_decomposed(
+        self,
+        simulator: _CoalitionSimulator,
+        tasks: List[Tuple[int, Tuple[int, ...]]],
+    ) -> Iterator[Tuple[Tuple[int, Tuple[int, ...]], CoalitionOutcome]]:
+        """(task, outcome) pairs assembled from component runs, in completion order.
+
+        A component's runs are dropped from ``simulator.component_runs`` as soon
+        as the last coalition containing it is assembled, so components used
+        once (e.g. whole coalitions on dense graphs) are never held. On the pool
+        components arrive in mask order and each coalition is assembled once
+        its largest component has arrived.
+        """
+
+        component_masks: Dict[int, List[int]] = {}
+        users: Dict[int, int] = {}
+        for index, coalition_ids in tasks:
+            subgraph = self.graph.induced([self.agents[i].agent_id for i in coalition_ids])
+            masks = [mask for mask, _ in simulator.components(coalition_ids, subgraph)]
+            component_masks[index] = masks
+            for mask in masks:
+                users[mask] = users.get(mask, 0) + 1
+
+        def assemble(task: Tuple[int, Tuple[int, ...]]) -> CoalitionOutcome:
+            outcome = simulator.evaluate(*task)
+            for mask in component_masks[task[0]]:
+                users[mask] -= 1
+                if not users[mask]:
+                    # この成分を含む提携はもう残っていない
+                    del users[mask]
+                    simulator.component_runs.pop(mask, None)
+            return outcome
+
+        if not self.workers or self.workers <= 1 or len(tasks) <= 1:
+            # 逐次実行では成分は必要になった時点で計算する
+            for task in tasks:
+                yield task, assemble(task)
+            return
+        ready: Dict[int, List[Tuple[int, Tuple[int, ...]]]] = {}
+        for task in tasks:
+            ready.setdefault(max(component_masks[task[0]]), []).append(task)
+        count = self.adaptive.min_runs if self.adaptive is not None else self.runs
+        component_tasks: List[ComponentTask] = [
+            (mask, tuple(i for i in range(len(self.agents)) if mask >> i & 1), count) for mask in sorted(users)
+        ]
+        results = self._iter_pool(
+            simulator,
+            _component_in_worker,
+            component_tasks,
+            lambda mask, agent_ids, runs: simulator.component_results(
+                mask, [self.agents[i] for i in agent_ids], runs
+            ),
+        )
+        for (mask, _, _), runs in zip(component_tasks, results):
+            simulator.component_runs[mask] = list(runs)
+            for task in ready.pop(mask, []):
+                yield task, assemble(task)
+
+    def _store_keys(self) -> Tuple[str, str]:
+        """(landscape hash, config hash) identifying this build in the result store."""
+
+        protocol = type(self.protocol)
+        scenario = {
+            "scenario": "lazer2007",
+            "sim_config": replace(self.sim_config, rng_seed=None),
+            "runs": self.runs,
+            "protocol": f"{protocol.__module__}.{protocol.__qualname__}",
+            "adaptive": self.adaptive,
+            "decompose": self.decompose,
+            "agents": [(agent.agent_id, list(agent.bits), agent.player_id) for agent in self.agents],
+            # 近傍の順序は同点時の模倣先を決めるので、そのまま含める
+            "graph": [(node, list(self.base_graph.neighbors(node))) for node in self.base_graph.nodes],
+        }
+        return landscape_fingerprint(self.landscape), config_hash(scenario)
+
+    def _seed_key(self, coalition_index: int) -> str:
+        # 提携の run の seed は SeedSequence(entropy, spawn_key=(index, run)) で決まる
+        return f"{self.entropy}/{coalition_index}"
+
+    def _iter_pool(
+        self,
+        simulator: _CoalitionSimulator,
+        worker_fn: Callable[[Any], Any],
+        tasks: Sequence[Tuple],
+        serial_fn: Callable[..., Any],
+    ) -> Iterator[Any]:
+        """Results of ``tasks`` in order, yielded as they finish (serially or on the pool)."""
+
+        if not self.workers or self.workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield serial_fn(*task)
+            return
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        # 景観は共有メモリで 1 度だけ公開し、ワーカーにはゼロコピーで見せる
+        template = replace(simulator, landscape=None, fitness_cache=None, component_runs={})
+        # キャッシュ容量はワーカーで等分し、合計がワーカー数によらず fitness_cache_size に収まるようにする
+        cache_capacity = self.fitness_cache.capacity // self.workers if self.fitness_cache is not None else None
+        with SharedLandscape(self.landscape) as shared:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(template, shared.payload, cache_capacity),
+            ) as executor:
+                yield from executor.map(worker_fn, tasks, chunksize=chunksize)
+
     def _enumerate_coalitions(self, max_size: Optional[int]) -> Iterable[Tuple[int, ...]]:
         num_agents = len(self.agents)
         yield tuple()
@@ -114,3 +430,24 @@ class GameTableBuilder:
     def to_csv(self, path: str) -> None:
         df = self.to_dataframe()
         df.to_csv(path, index=False)
+
+
+def _merge_results(parts: Sequence[SimulationResult]) -> SimulationResult:
+    """Combine runs of disjoint components into the coalition's result.
+
+    Final scores are the union of the parts and the best score is the best of
+    the parts; per-round history is not combined.
+    """
+
+    final_scores: Dict[int, float] = {}
+    for part in parts:
+        final_scores.update(part.final_scores)
+    best = max(parts, key=lambda part: part.best_score)
+    converged = [part.converged_at for part in parts]
+    return SimulationResult(
+        history=[],
+        final_scores=final_scores,
+        best_score=best.best_score,
+        best_state=best.best_state,
+        converged_at=None if None in converged else max(converged),
+    )
@@ -1,5 +1,6 @@
 """Levinthal 1997 scenario helpers."""
 
+from .exact import exact_search_moments
 from .game_table import LevinthalGameTableBuilder, LevinthalPlayer
 
-__all__ = ["LevinthalGameTableBuilder", "LevinthalPlayer"]
+__all__ = ["LevinthalGameTableBuilder", "LevinthalPlayer", "exact_search_moments"]
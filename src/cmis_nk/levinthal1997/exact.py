@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from ..landscape import NKLandscape
+from ..local_search import LocalSearchConfig
+
+
+MAX_EXACT_BITS = 14
+# moments 配列 (2^|S|, 2, max_steps + 1) の上限。超える提携は Monte Carlo に回す
+EXACT_MEMORY_BUDGET = 256 * 2**20
+
+
+def exact_supported(config: LocalSearchConfig) -> bool:
+    """Whether :func:`exact_search_moments` models ``config`` exactly."""
+
+    return config.strategy == "random_sample" and config.noise_accept_prob == 0.0
+
+
+def exact_memory_bytes(width: int, config: LocalSearchConfig) -> int:
+    """Size of the moment table :func:`exact_search_moments` allocates for ``width`` free bits."""
+
+    return (1 << width) * 2 * (max(0, int(config.max_steps)) + 1) * 8
+
+
+def exact_fits(width: int, config: LocalSearchConfig) -> bool:
+    """Whether ``width`` free bits are within :data:`MAX_EXACT_BITS` and :data:`EXACT_MEMORY_BUDGET`."""
+
+    return width <= MAX_EXACT_BITS and exact_memory_bytes(width, config) <= EXACT_MEMORY_BUDGET
+
+
+def exact_search_moments(
+    landscape: NKLandscape,
+    baseline_state: np.ndarray,
+    free_bits: Sequence[int],
+    config: LocalSearchConfig,
+) -> Tuple[float, float]:
+    """Exact mean and std of the final fitness of :class:`LocalSearchEngine`.
+
+    Without noise the random-bit climb only moves to fitter states, so it is a
+    Markov chain on the 2^|S| sub-states with a stall counter and a step budget.
+    From state ``s`` with ``q = (#improving bits) / |S|`` and remaining budget
+    ``r`` the value is::
+
+        V(s, r) = sum_{k=1..min(L, r)} q (1 - q)^(k-1) A_s(r - k) + (1 - q)^min(L, r) f(s)
+
+    where ``L = stall_limit`` and ``A_s`` averages ``V`` over the improving
+    neighbors. States are processed by height (longest improving path), so every
+    ``A_s`` only reads finished rows. The same recursion with ``f(s)^2`` gives
+    the second moment. Memory is O(2^|S| * max_steps).
+    """
+
+    if not exact_supported(config):
+        raise ValueError("exact mode requires strategy=random_sample and noise_accept_prob=0")
+    free = np.asarray(sorted({int(bit) for bit in free_bits}), dtype=np.intp)
+    width = free.size
+    if width > MAX_EXACT_BITS:
+        raise ValueError(f"exact mode supports at most {MAX_EXACT_BITS} free bits (got {width})")
+    if not exact_fits(width, config):
+        raise ValueError(
+            f"exact mode for {width} free bits and max_steps={config.max_steps} needs "
+            f"{exact_memory_bytes(width, config)} bytes (budget {EXACT_MEMORY_BUDGET})"
+        )
+    baseline = np.asarray(baseline_state, dtype=np.int8)
+    if width == 0:
+        fitness = float(landscape.evaluate(baseline))
+        return fitness, 0.0
+
+    # 部分状態 index のビット j が free[j] に対応する
+    sub_states = np.arange(1 << width, dtype=np.int64)
+    shifts = np.arange(width, dtype=np.int64)
+    states = np.tile(baseline, (sub_states.size, 1))
+    states[:, free] = ((sub_states[:, np.newaxis] >> shifts) & 1).astype(np.int8)
+    fitness = landscape.evaluate_many(states)
+    neighbors = sub_states[:, np.newaxis] ^ (1 << shifts)
+    improving = fitness[neighbors] > fitness[:, np.newaxis]
+    counts = improving.sum(axis=1)
+    q = counts / width
+
+    height = np.zeros(sub_states.size, dtype=np.int64)
+    while True:
+        updated = np.where(improving, height[neighbors] + 1, 0).max(axis=1)
+        if np.array_equal(updated, height):
+            break
+        height = updated
+
+    horizon = max(0, int(config.max_steps))
+    patience = max(0, int(config.stall_limit))
+    budgets = np.minimum(patience, np.arange(horizon + 1))
+    terminal = np.stack([fitness, fitness**2], axis=1)  # (2^|S|, 2)
+    moments = np.empty((sub_states.size, 2, horizon + 1))
+    for level in range(int(height.max()) + 1):
+        group = np.flatnonzero(height == level)
+        q_group = q[group]
+        stay = (1.0 - q_group)[:, np.newaxis] ** budgets[np.newaxis, :]
+        values = stay[:, np.newaxis, :] * terminal[group][:, :, np.newaxis]
+        if level > 0:
+            averaged = np.zeros_like(values)
+            for j in range(width):
+                mask = improving[group, j]
+                averaged[mask] += moments[neighbors[group[mask], j]]
+            averaged /= np.maximum(counts[group], 1)[:, np.newaxis, np.newaxis]
+            for k in range(1, min(patience, horizon) + 1):
+                weight = q_group * (1.0 - q_group) ** (k - 1)
+                values[:, :, k:] += weight[:, np.newaxis, np.newaxis] * averaged[:, :, : horizon + 1 - k]
+        moments[group] = values
+
+    start = int(sum(int(baseline[bit]) << j for j, bit in enumerate(free)))
+    if config.init_strategy == "baseline":
+        weights = np.zeros(sub_states.size)
+        weights[start] = 1.0
+    elif config.init_strategy == "perturb":
+        distance = np.array([bin(int(x)).count("1") for x in sub_states ^ start])
+        p = config.perturb_prob
+        weights = p**distance * (1.0 - p) ** (width - distance)
+    else:
+        weights = np.full(sub_states.size, 1.0 / sub_states.size)
+    mean, second = weights @ moments[:, :, horizon]
+    return float(mean), float(np.sqrt(max(second - mean**2, 0.0)))
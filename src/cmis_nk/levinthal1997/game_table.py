@@ -1,15 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
+from ..common.adaptive import AdaptiveSampling, sample_adaptively
 from ..common.game_types import GameTableRecord
+from ..common.seeding import root_entropy, spawn_seed
+from ..fitness_cache import FitnessCache
 from ..landscape import NKLandscape
+from ..landscape_store import landscape_fingerprint
 from ..local_search import LocalSearchConfig, LocalSearchEngine
+from ..result_store import CoalitionResultStore, coalition_mask, config_hash
 from ..utils import enumerate_coalitions
+from .exact import EXACT_MEMORY_BUDGET, MAX_EXACT_BITS, exact_fits, exact_search_moments, exact_supported
 
 
 @dataclass
@@ -18,8 +25,99 @@ class LevinthalPlayer:
     bits: List[int]
 
 
+# (mean, std, runs, notes suffix)
+CoalitionOutcome = Tuple[float, float, int, str]
+
+# off: 提携ごとに毎回計算 / shared: 同じ自由ビット集合の結果を使い回す /
+# independent: 乱数に依存しない（決定的な）結果だけ使い回し、Monte Carlo は提携ごとに独立に引く
+DEDUPE_POLICIES = ("off", "shared", "independent")
+
+
+@dataclass
+class _CoalitionEvaluator:
+    """Everything needed to evaluate one coalition; pickled once per worker process."""
+
+    landscape: NKLandscape
+    baseline_state: np.ndarray
+    search_config: LocalSearchConfig
+    trials: int
+    entropy: int
+    exact_max_bits: Optional[int] = None
+    fitness_cache: Optional[FitnessCache] = None
+    adaptive: Optional[AdaptiveSampling] = None
+
+    def wants_exact(self, free_bits: Sequence[int]) -> bool:
+        return (
+            self.exact_max_bits is not None
+            and len(free_bits) <= self.exact_max_bits
+            and exact_supported(self.search_config)
+        )
+
+    def uses_exact(self, free_bits: Sequence[int]) -> bool:
+        # メモリ予算に収まらない提携は Monte Carlo にフォールバックする
+        return self.wants_exact(free_bits) and exact_fits(len(free_bits), self.search_config)
+
+    def is_deterministic(self, free_bits: Sequence[int]) -> bool:
+        """Whether the outcome for ``free_bits`` does not depend on the seed."""
+
+        config = self.search_config
+        return (
+            not free_bits
+            or self.uses_exact(free_bits)
+            or (config.strategy == "steepest" and config.init_strategy == "baseline")
+        )
+
+    def evaluate(self, coalition_index: int, free_bits: Sequence[int]) -> CoalitionOutcome:
+        if not free_bits:
+            # 適応サンプリングでは runs は実際の試行数なので、試行しない空集合は 0（Lazer の空提携と同じ）
+            runs = 0 if self.adaptive is not None else self.trials
+            return float(self.landscape.evaluate(self.baseline_state)), 0.0, runs, ""
+        if self.uses_exact(free_bits):
+            mean_value, std_value = exact_search_moments(
+                self.landscape, self.baseline_state, free_bits, self.search_config
+            )
+            # 試行はしていないので runs=0（厳密計算であることは notes の method=exact で示す）
+            return mean_value, std_value, 0, ";method=exact"
+        fallback_note = ";exact_skipped=memory" if self.wants_exact(free_bits) else ""
+        engine = LocalSearchEngine(
+            landscape=self.landscape,
+            baseline_state=self.baseline_state,
+            free_bits=free_bits,
+            config=self.search_config,
+            # 提携 index だけで決まる乱数列なので、評価順やワーカー数に依存しない
+            rng_seed=spawn_seed(self.entropy, coalition_index),
+            fitness_cache=self.fitness_cache,
+        )
+        if self.adaptive is not None:
+            stats = sample_adaptively(
+                lambda count: [res.final_fitness for res in engine.run_trials(count)],
+                self.adaptive,
+            )
+            return stats.mean, stats.std, stats.count, fallback_note
+        fitness_values = [res.final_fitness for res in engine.run_trials(self.trials)]
+        return float(np.mean(fitness_values)), float(np.std(fitness_values)), self.trials, fallback_note
+
+
+_WORKER_EVALUATOR: Optional[_CoalitionEvaluator] = None
+
+
+def _init_worker(evaluator: _CoalitionEvaluator) -> None:
+    global _WORKER_EVALUATOR
+    _WORKER_EVALUATOR = evaluator
+
+
+def _evaluate_in_worker(task: Tuple[int, List[int]]) -> CoalitionOutcome:
+    assert _WORKER_EVALUATOR is not None
+    return _WORKER_EVALUATOR.evaluate(*task)
+
+
 class LevinthalGameTableBuilder:
-    """Game-table generator using Levinthal-style constrained local search."""
+    """Game-table generator using Levinthal-style constrained local search.
+
+    Coalition ``i`` searches with the seed ``spawn_seed(entropy, i)``, so the
+    table is identical whether coalitions run serially or on ``workers``
+    processes (each worker receives the landscape once, at start-up).
+    """
 
     def __init__(
         self,
@@ -30,43 +128,89 @@ class LevinthalGameTableBuilder:
         trials: int,
         rng_seed: Optional[int] = None,
         scenario_name: str = "levinthal1997",
+        fitness_cache: Optional[FitnessCache] = None,
+        exact_max_bits: Optional[int] = None,
+        workers: Optional[int] = None,
+        adaptive: Optional[AdaptiveSampling] = None,
+        dedupe: str = "off",
+        result_store: Optional[CoalitionResultStore] = None,
+        resume: bool = False,
     ) -> None:
+        if dedupe not in DEDUPE_POLICIES:
+            raise ValueError(f"Unsupported dedupe policy: {dedupe}")
+        if exact_max_bits is not None and not 0 <= exact_max_bits <= MAX_EXACT_BITS:
+            raise ValueError(f"exact_max_bits must be between 0 and {MAX_EXACT_BITS}")
         self.landscape = landscape
         self.baseline_state = baseline_state.astype(np.int8)
         self.players = list(players)
         self.search_config = search_config
         self.trials = trials
-        self.rng = np.random.default_rng(rng_seed)
+        self.entropy = root_entropy(rng_seed)
         self.scenario_name = scenario_name
+        self.fitness_cache = fitness_cache
+        # 自由ビット数がこれ以下の提携は Monte Carlo ではなくマルコフ連鎖で厳密計算する
+        self.exact_max_bits = exact_max_bits
+        self.workers = workers
+        # 指定時は trials の代わりに信頼区間の半幅で提携ごとの試行数を決める
+        self.adaptive = adaptive
+        self.dedupe = dedupe
+        # 完了した提携の結果を永続化し、resume 時は保存済みの提携を計算し直さない
+        self.result_store = result_store
+        self.resume = resume
         self.records: List[GameTableRecord] = []
 
     def build_table(self, max_size: Optional[int] = None) -> pd.DataFrame:
         self.records.clear()
-        coalition_index = 0
-        baseline_fitness = float(self.landscape.evaluate(self.baseline_state))
-        for coalition in enumerate_coalitions(self.players, max_size):
+        coalitions = list(enumerate_coalitions(self.players, max_size))
+        tasks = [
+            (index, sorted({bit for player in coalition for bit in player.bits}))
+            for index, coalition in enumerate(coalitions)
+        ]
+        evaluator = _CoalitionEvaluator(
+            landscape=self.landscape,
+            baseline_state=self.baseline_state,
+            search_config=self.search_config,
+            trials=self.trials,
+            entropy=self.entropy,
+            exact_max_bits=self.exact_max_bits,
+            fitness_cache=self.fitness_cache,
+            adaptive=self.adaptive,
+        )
+        sources = self._dedupe_sources(evaluator, tasks)
+        unique_tasks = [task for task in tasks if sources[task[0]] == task[0]]
+        position = {id(player): idx for idx, player in enumerate(self.players)}
+        masks = [coalition_mask(position[id(player)] for player in coalition) for coalition in coalitions]
+        unique_outcomes: Dict[int, CoalitionOutcome] = {}
+        store_keys = self._store_keys() if self.result_store is not None else None
+        if store_keys is not None and self.resume:
+            stored = self.result_store.load(*store_keys)
+            for index, _ in unique_tasks:
+                outcome = stored.get((masks[index], self._seed_key(index)))
+                if outcome is not None:
+                    unique_outcomes[index] = outcome
+        pending = [task for task in unique_tasks if task[0] not in unique_outcomes]
+        for (index, _), outcome in zip(pending, self._evaluate_coalitions(evaluator, pending)):
+            unique_outcomes[index] = outcome
+            if store_keys is not None:
+                self.result_store.put(*store_keys, masks[index], self._seed_key(index), outcome)
+        if self.result_store is not None:
+            self.result_store.flush()
+        outcomes = [unique_outcomes[sources[index]] for index, _ in tasks]
+        base_notes = (
+            f"scenario={self.scenario_name};N={self.landscape.N};"
+            f"K={self.landscape.K};trials={self.trials}"
+        )
+        if self.search_config.strategy != "random_sample":
+            base_notes += f";strategy={self.search_config.strategy}"
+        if self.adaptive is not None:
+            base_notes += f";{self.adaptive.note()}"
+        if self.dedupe != "off":
+            base_notes += f";dedupe={self.dedupe};reused={len(tasks) - len(unique_tasks)}/{len(tasks)}"
+        for coalition_index, (coalition, outcome) in enumerate(zip(coalitions, outcomes)):
+            mean_value, std_value, runs, method_note = outcome
+            if sources[coalition_index] != coalition_index:
+                method_note += f";reused_from={sources[coalition_index]}"
             member_ids = tuple(player.player_id for player in coalition)
-            free_bits = sorted({bit for player in coalition for bit in player.bits})
-            if not free_bits:
-                mean_value = baseline_fitness
-                std_value = 0.0
-            else:
-                seed = int(self.rng.integers(0, 1_000_000_000))
-                engine = LocalSearchEngine(
-                    landscape=self.landscape,
-                    baseline_state=self.baseline_state,
-                    free_bits=free_bits,
-                    config=self.search_config,
-                    rng_seed=seed,
-                )
-                results = engine.run_trials(self.trials)
-                fitness_values = [res.final_fitness for res in results]
-                mean_value = float(np.mean(fitness_values))
-                std_value = float(np.std(fitness_values))
-            notes = (
-                f"scenario={self.scenario_name};N={self.landscape.N};"
-                f"K={self.landscape.K};trials={self.trials}"
-            )
             self.records.append(
                 GameTableRecord(
                     coalition_id=coalition_index,
@@ -74,13 +218,72 @@ class LevinthalGameTableBuilder:
                     size=len(member_ids),
                     mean_value=mean_value,
                     std_value=std_value,
-                    runs=self.trials,
-                    notes=notes,
+                    runs=runs,
+                    notes=base_notes + method_note,
                 )
             )
-            coalition_index += 1
         return self.to_dataframe()
 
+    def _dedupe_sources(
+        self,
+        evaluator: _CoalitionEvaluator,
+        tasks: List[Tuple[int, List[int]]],
+    ) -> Dict[int, int]:
+        """Map each coalition index to the index whose outcome it reuses (itself if none)."""
+
+        sources: Dict[int, int] = {}
+        first_seen: Dict[frozenset, int] = {}
+        for index, free_bits in tasks:
+            key = frozenset(free_bits)
+            reusable = self.dedupe == "shared" or (
+                self.dedupe == "independent" and evaluator.is_deterministic(free_bits)
+            )
+            if reusable and key in first_seen:
+                sources[index] = first_seen[key]
+            else:
+                first_seen.setdefault(key, index)
+                sources[index] = index
+        return sources
+
+    def _evaluate_coalitions(
+        self,
+        evaluator: _CoalitionEvaluator,
+        tasks: List[Tuple[int, List[int]]],
+    ) -> Iterator[CoalitionOutcome]:
+        """Outcomes of ``tasks`` in order, yielded as they finish (serially or on the pool)."""
+
+        if not self.workers or self.workers <= 1 or len(tasks) <= 1:
+            for index, free_bits in tasks:
+                yield evaluator.evaluate(index, free_bits)
+            return
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(evaluator,),
+        ) as executor:
+            yield from executor.map(_evaluate_in_worker, tasks, chunksize=chunksize)
+
+    def _store_keys(self) -> Tuple[str, str]:
+        """(landscape hash, config hash) identifying this build in the result store."""
+
+        scenario = {
+            "scenario": self.scenario_name,
+            "search_config": replace(self.search_config, rng_seed=None),
+            "baseline_state": self.baseline_state.tolist(),
+            "players": [(player.player_id, list(player.bits)) for player in self.players],
+            "trials": self.trials,
+            "exact_max_bits": self.exact_max_bits,
+            "exact_memory_budget": EXACT_MEMORY_BUDGET,
+            "adaptive": self.adaptive,
+            "dedupe": self.dedupe,
+        }
+        return landscape_fingerprint(self.landscape), config_hash(scenario)
+
+    def _seed_key(self, coalition_index: int) -> str:
+        # 提携の探索の seed は SeedSequence(entropy, spawn_key=(index,)) で決まる
+        return f"{self.entropy}/{coalition_index}"
+
     def to_dataframe(self) -> pd.DataFrame:
         return pd.DataFrame([record.__dict__ for record in self.records])
 
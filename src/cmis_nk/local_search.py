@@ -5,9 +5,14 @@ from typing import Iterable, Literal, Optional, Sequence
 
 import numpy as np
 
+from .fitness_cache import FitnessCache
 from .landscape import NKLandscape
 
 
+SearchStrategy = Literal["random_sample", "steepest", "first_improvement"]
+SEARCH_STRATEGIES = ("random_sample", "steepest", "first_improvement")
+
+
 @dataclass
 class LocalSearchConfig:
     max_steps: int = 250
@@ -16,6 +21,9 @@ class LocalSearchConfig:
     init_strategy: Literal["random", "baseline", "perturb"] = "random"
     perturb_prob: float = 0.15
     rng_seed: Optional[int] = None
+    batch_trials: bool = True  # run_trials を (trials, N) 行列で同時に進める
+    # random_sample: 従来のランダム 1 ビット試行 / steepest, first_improvement: 真の局所最適まで
+    strategy: SearchStrategy = "random_sample"
 
 
 @dataclass
@@ -24,6 +32,7 @@ class LocalSearchResult:
     final_fitness: float
     best_fitness: float
     steps: int
+    evaluations: int = 0  # 初期状態 + 評価した候補（差分）の数
 
 
 class LocalSearchEngine:
@@ -36,55 +45,125 @@ class LocalSearchEngine:
         free_bits: Sequence[int],
         config: LocalSearchConfig,
         rng_seed: Optional[int] = None,
+        fitness_cache: Optional[FitnessCache] = None,
     ) -> None:
         if len(baseline_state) != landscape.N:
             raise ValueError("baseline_state length must match landscape.N")
+        if config.strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unsupported search strategy: {config.strategy}")
         self.landscape = landscape
         self.baseline_state = baseline_state.astype(np.int8)
         self.free_bits = sorted(set(int(bit) for bit in free_bits))
         self.config = config
         seed = rng_seed if rng_seed is not None else config.rng_seed
         self.rng = np.random.default_rng(seed)
+        # 近傍は flip_delta で差分評価するため、キャッシュは初期状態の評価にのみ使う
+        self._fitness_cache = fitness_cache
+        self._evaluate = fitness_cache.evaluate if fitness_cache is not None else landscape.evaluate
 
     def run_trials(self, trials: int) -> list[LocalSearchResult]:
+        batchable = self.config.strategy == "random_sample" and self.config.batch_trials
+        if batchable and self.free_bits and trials > 1:
+            return self._run_batch(trials)
         return [self._run_once() for _ in range(trials)]
 
+    def _run_batch(self, trials: int) -> list[LocalSearchResult]:
+        """Run ``trials`` independent searches in lockstep as a (trials, N) matrix.
+
+        Each step draws one free bit per active trial in a single RNG call and
+        evaluates all candidates with :meth:`NKLandscape.flip_delta_many`. The
+        acceptance rule is the one of :meth:`_run_once` (improvement over the
+        best-so-far, otherwise ``noise_accept_prob``); trials that reached
+        ``stall_limit`` are masked out. The random stream is consumed in a
+        different order than the serial loop, so individual results differ
+        from ``batch_trials=False`` while following the same distribution.
+        """
+
+        landscape = self.landscape
+        free_bits = np.asarray(self.free_bits, dtype=np.intp)
+        states = self._initial_states(trials)
+        contributions = landscape._contributions(states)
+        evaluate_many = (
+            self._fitness_cache.evaluate_many
+            if self._fitness_cache is not None
+            else landscape.evaluate_many
+        )
+        best_fitness = np.asarray(evaluate_many(states), dtype=float)
+        stall = np.zeros(trials, dtype=np.int64)
+        steps = np.zeros(trials, dtype=np.int64)
+        noise = self.config.noise_accept_prob
+        for _ in range(self.config.max_steps):
+            idx = np.flatnonzero(stall < self.config.stall_limit)
+            if idx.size == 0:
+                break
+            steps[idx] += 1
+            bits = free_bits[self.rng.integers(0, free_bits.size, size=idx.size)]
+            candidate_fitness, candidate_contributions = landscape.flip_delta_many(
+                states[idx], contributions[idx], bits
+            )
+            # Levinthal 仕様: 「これまでのベスト」を基準に改善判定
+            improved = candidate_fitness > best_fitness[idx]
+            accept = improved
+            if noise > 0.0:
+                accept = improved | (self.rng.random(idx.size) < noise)
+            accepted = idx[accept]
+            states[accepted, bits[accept]] ^= 1
+            contributions[accepted] = candidate_contributions[accept]
+            best_fitness[idx[improved]] = candidate_fitness[improved]
+            stall[idx] = np.where(improved, 0, stall[idx] + 1)
+        return [
+            LocalSearchResult(
+                final_state=states[trial].copy(),
+                final_fitness=float(best_fitness[trial]),
+                best_fitness=float(best_fitness[trial]),
+                steps=int(steps[trial]),
+                evaluations=int(steps[trial]) + 1,
+            )
+            for trial in range(trials)
+        ]
+
     def run_with_history(self) -> tuple[LocalSearchResult, list[float]]:
         """1 回のローカル探索を実行し、ベストフィットネスの推移も返す。"""
 
         if not self.free_bits:
-            fitness = float(self.landscape.evaluate(self.baseline_state))
+            fitness = float(self._evaluate(self.baseline_state))
             result = LocalSearchResult(
                 final_state=self.baseline_state.copy(),
                 final_fitness=fitness,
                 best_fitness=fitness,
                 steps=0,
+                evaluations=1,
             )
             return result, [fitness]
+        if self.config.strategy != "random_sample":
+            history: list[float] = []
+            return self._climb(history), history
         current_state = self._initial_state()
-        current_fitness = float(self.landscape.evaluate(current_state))
+        current_contributions = self.landscape.contributions(current_state)
+        current_fitness = float(self._evaluate(current_state))
         best_state = current_state.copy()
         best_fitness = current_fitness
-        history: list[float] = [best_fitness]
+        history = [best_fitness]
         stall_counter = 0
         steps = 0
         while steps < self.config.max_steps and stall_counter < self.config.stall_limit:
             steps += 1
             bit = int(self.rng.choice(self.free_bits))
-            candidate_state = current_state.copy()
-            candidate_state[bit] = 1 - candidate_state[bit]
-            candidate_fitness = float(self.landscape.evaluate(candidate_state))
+            candidate_fitness, candidate_contributions = self.landscape.flip_delta(
+                current_state, current_contributions, bit
+            )
             improved = candidate_fitness > best_fitness
             accept = improved
             if not accept and self.config.noise_accept_prob > 0.0:
                 if self.rng.random() < self.config.noise_accept_prob:
                     accept = True
             if accept:
-                current_state = candidate_state
+                current_state[bit] = 1 - current_state[bit]
+                current_contributions = candidate_contributions
                 current_fitness = candidate_fitness
                 if improved:
                     best_fitness = candidate_fitness
-                    best_state = candidate_state.copy()
+                    best_state = current_state.copy()
                     stall_counter = 0
                 else:
                     stall_counter += 1
@@ -96,20 +175,25 @@ class LocalSearchEngine:
             final_fitness=best_fitness,
             best_fitness=best_fitness,
             steps=steps,
+            evaluations=steps + 1,
         )
         return result, history
 
     def _run_once(self) -> LocalSearchResult:
         if not self.free_bits:
-            fitness = float(self.landscape.evaluate(self.baseline_state))
+            fitness = float(self._evaluate(self.baseline_state))
             return LocalSearchResult(
                 final_state=self.baseline_state.copy(),
                 final_fitness=fitness,
                 best_fitness=fitness,
                 steps=0,
+                evaluations=1,
             )
+        if self.config.strategy != "random_sample":
+            return self._climb()
         current_state = self._initial_state()
-        current_fitness = float(self.landscape.evaluate(current_state))
+        current_contributions = self.landscape.contributions(current_state)
+        current_fitness = float(self._evaluate(current_state))
         best_state = current_state.copy()
         best_fitness = current_fitness
         stall_counter = 0
@@ -117,9 +201,10 @@ class LocalSearchEngine:
         while steps < self.config.max_steps and stall_counter < self.config.stall_limit:
             steps += 1
             bit = int(self.rng.choice(self.free_bits))
-            candidate_state = current_state.copy()
-            candidate_state[bit] = 1 - candidate_state[bit]
-            candidate_fitness = float(self.landscape.evaluate(candidate_state))
+            # 反転ビットに依存する寄与だけを再計算する（状態コピーなし）
+            candidate_fitness, candidate_contributions = self.landscape.flip_delta(
+                current_state, current_contributions, bit
+            )
             # Levinthal 仕様: 「これまでのベスト」を基準に改善判定
             improved = candidate_fitness > best_fitness
             accept = improved
@@ -127,11 +212,12 @@ class LocalSearchEngine:
                 if self.rng.random() < self.config.noise_accept_prob:
                     accept = True
             if accept:
-                current_state = candidate_state
+                current_state[bit] = 1 - current_state[bit]
+                current_contributions = candidate_contributions
                 current_fitness = candidate_fitness
                 if improved:
                     best_fitness = candidate_fitness
-                    best_state = candidate_state.copy()
+                    best_state = current_state.copy()
                     stall_counter = 0
                 else:
                     stall_counter += 1
@@ -143,6 +229,78 @@ class LocalSearchEngine:
             final_fitness=best_fitness,
             best_fitness=best_fitness,
             steps=steps,
+            evaluations=steps + 1,
+        )
+
+    def _climb(self, history: Optional[list[float]] = None) -> LocalSearchResult:
+        """Steepest-ascent / first-improvement climb to a true local optimum.
+
+        One-flip deltas of the free bits are kept between moves; after a move only
+        the entries coupled to the flipped bit (:meth:`NKLandscape.coupled_bits`)
+        are marked stale and recomputed, and each recomputed delta counts as one
+        evaluation. The climb stops as soon as no free bit improves (or after
+        ``max_steps`` moves); ``stall_limit`` and ``noise_accept_prob`` are unused.
+        """
+
+        landscape = self.landscape
+        free_bits = np.asarray(self.free_bits, dtype=np.intp)
+        position = np.full(landscape.N, -1, dtype=np.intp)
+        position[free_bits] = np.arange(free_bits.size)
+        state = self._initial_state()
+        contributions = landscape.contributions(state)
+        fitness = float(self._evaluate(state))
+        evaluations = 1
+        deltas = np.zeros(free_bits.size)
+        stale = np.ones(free_bits.size, dtype=bool)
+        first_improvement = self.config.strategy == "first_improvement"
+        steps = 0
+        if history is not None:
+            history.append(fitness)
+        while steps < self.config.max_steps:
+            choice: Optional[int] = None
+            if first_improvement:
+                # ランダム順に走査し、古くなった差分だけを再計算して最初の改善で止める
+                for pos in self.rng.permutation(free_bits.size):
+                    if stale[pos]:
+                        deltas[pos] = landscape.neighborhood_deltas_many(
+                            state[np.newaxis, :], free_bits[pos : pos + 1], contributions[np.newaxis, :]
+                        )[0, 0]
+                        stale[pos] = False
+                        evaluations += 1
+                    if deltas[pos] > 0:
+                        choice = int(pos)
+                        break
+            else:
+                refresh = np.flatnonzero(stale)
+                if refresh.size:
+                    deltas[refresh] = landscape.neighborhood_deltas_many(
+                        state[np.newaxis, :], free_bits[refresh], contributions[np.newaxis, :]
+                    )[0]
+                    stale[refresh] = False
+                    evaluations += int(refresh.size)
+                best_pos = int(np.argmax(deltas))
+                if deltas[best_pos] > 0:
+                    choice = best_pos
+            if choice is None:
+                break
+            bit = int(free_bits[choice])
+            candidate_fitness, candidate_contributions = landscape.flip_delta(state, contributions, bit)
+            if candidate_fitness <= fitness:
+                break  # 差分が丸め誤差でだけ正だった場合も局所最適とみなす
+            state[bit] = 1 - state[bit]
+            contributions = candidate_contributions
+            fitness = candidate_fitness
+            steps += 1
+            coupled = position[landscape.coupled_bits(bit)]
+            stale[coupled[coupled >= 0]] = True
+            if history is not None:
+                history.append(fitness)
+        return LocalSearchResult(
+            final_state=state,
+            final_fitness=fitness,
+            best_fitness=fitness,
+            steps=steps,
+            evaluations=evaluations,
         )
 
     def _initial_state(self) -> np.ndarray:
@@ -157,3 +315,17 @@ class LocalSearchEngine:
         # default random
         state[self.free_bits] = self.rng.integers(0, 2, size=len(self.free_bits), dtype=np.int8)
         return state
+
+    def _initial_states(self, trials: int) -> np.ndarray:
+        """Batched :meth:`_initial_state`: a (trials, N) matrix of starting states."""
+
+        states = np.tile(self.baseline_state, (trials, 1))
+        if self.config.init_strategy == "baseline":
+            return states
+        free_bits = np.asarray(self.free_bits, dtype=np.intp)
+        if self.config.init_strategy == "perturb":
+            flips = self.rng.random((trials, free_bits.size)) < self.config.perturb_prob
+            states[:, free_bits] ^= flips.astype(np.int8)
+            return states
+        states[:, free_bits] = self.rng.integers(0, 2, size=(trials, free_bits.size), dtype=np.int8)
+        return states
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, Optional
+from typing import Dict, Hashable, Iterator, List, Literal, Optional, Sequence, Set, Tuple
 
 import networkx as nx
 
@@ -32,3 +32,118 @@ class NetworkFactory:
             raise ValueError(f"Unsupported network_type={self.network_type}")
         nx.set_node_attributes(graph, {node: {"label": f"Agent{node}"} for node in graph.nodes})
         return graph
+
+
+class CompiledGraph:
+    """Immutable undirected graph with per-node neighbor bitmasks.
+
+    Bit ``j`` of a mask is the ``j``-th node of the base graph. A coalition's
+    induced graph shares the base arrays and only carries a member mask, so
+    :meth:`induced` costs O(sum of member degrees) instead of a networkx
+    ``subgraph().copy()``. Neighbor order follows the base graph, which keeps
+    tie-breaking between equally fit neighbors stable.
+    """
+
+    def __init__(
+        self,
+        node_ids: Sequence[Hashable],
+        neighbor_positions: Sequence[Sequence[int]],
+        members: Optional[int] = None,
+    ) -> None:
+        self._node_ids: Tuple[Hashable, ...] = tuple(node_ids)
+        self._neighbor_positions: Tuple[Tuple[int, ...], ...] = tuple(
+            tuple(positions) for positions in neighbor_positions
+        )
+        self.position: Dict[Hashable, int] = {node: idx for idx, node in enumerate(self._node_ids)}
+        self.masks: Tuple[int, ...] = tuple(
+            sum(1 << pos for pos in positions) for positions in self._neighbor_positions
+        )
+        self.members = (1 << len(self._node_ids)) - 1 if members is None else members
+        self._adjacency = self._member_adjacency()
+
+    @classmethod
+    def from_networkx(cls, graph: nx.Graph) -> "CompiledGraph":
+        node_ids = list(graph.nodes)
+        position = {node: idx for idx, node in enumerate(node_ids)}
+        return cls(node_ids, [[position[nb] for nb in graph.neighbors(node)] for node in node_ids])
+
+    def induced(self, node_ids: Sequence[Hashable]) -> "CompiledGraph":
+        """Subgraph induced by ``node_ids`` (ids outside the base graph are ignored)."""
+
+        mask = 0
+        for node in node_ids:
+            pos = self.position.get(node)
+            if pos is not None:
+                mask |= 1 << pos
+        return self.induced_mask(mask)
+
+    def induced_mask(self, mask: int) -> "CompiledGraph":
+        graph = CompiledGraph.__new__(CompiledGraph)
+        graph._node_ids = self._node_ids
+        graph._neighbor_positions = self._neighbor_positions
+        graph.position = self.position
+        graph.masks = self.masks
+        graph.members = mask & self.members
+        graph._adjacency = graph._member_adjacency()
+        return graph
+
+    @property
+    def nodes(self) -> List[Hashable]:
+        return list(self._adjacency)
+
+    def number_of_nodes(self) -> int:
+        return len(self._adjacency)
+
+    def has_node(self, node: Hashable) -> bool:
+        return node in self._adjacency
+
+    def neighbors(self, node: Hashable) -> Iterator[Hashable]:
+        return iter(self._adjacency[node])
+
+    def neighbor_mask(self, node: Hashable) -> int:
+        return self.masks[self.position[node]] & self.members
+
+    def _member_adjacency(self) -> Dict[Hashable, Tuple[Hashable, ...]]:
+        # メンバー間の辺だけを残した近傍リスト（基底グラフの近傍順を保つ）
+        return {
+            self._node_ids[pos]: tuple(
+                self._node_ids[nb] for nb in self._neighbor_positions[pos] if self.members >> nb & 1
+            )
+            for pos in _mask_positions(self.members)
+        }
+
+    def component_masks(self) -> List[int]:
+        """Connected components as member bitmasks, ordered by their lowest node."""
+
+        components: List[int] = []
+        remaining = self.members
+        while remaining:
+            component = frontier = remaining & -remaining
+            while frontier:
+                pos = frontier.bit_length() - 1
+                frontier &= ~(1 << pos)
+                reached = self.masks[pos] & self.members & ~component
+                component |= reached
+                frontier |= reached
+            components.append(component)
+            remaining &= ~component
+        return components
+
+    def node_ids(self, mask: int) -> List[Hashable]:
+        return [self._node_ids[pos] for pos in _mask_positions(mask & self.members)]
+
+    def connected_components(self) -> List[Set[Hashable]]:
+        return [set(self.node_ids(mask)) for mask in self.component_masks()]
+
+
+def as_compiled_graph(graph: "nx.Graph | CompiledGraph") -> CompiledGraph:
+    return graph if isinstance(graph, CompiledGraph) else CompiledGraph.from_networkx(graph)
+
+
+def _mask_positions(mask: int) -> Iterator[int]:
+    pos = 0
+    while mask:
+        if mask & 1:
+            yield pos
+        mask >>= 1
+        pos += 1
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from typing import Union
+
+import numpy as np
+
+from .utils import bitstring_to_array
+
+
+WORD_BITS = 64
+PACKED_DTYPE = np.uint64
+
+
+def word_count(N: int) -> int:
+    """Number of uint64 words needed for an N-bit state (1 when N <= 64)."""
+
+    return max(1, (N + WORD_BITS - 1) // WORD_BITS)
+
+
+def pack_states(states: np.ndarray) -> np.ndarray:
+    """Pack 0/1 states of shape (..., N) into uint64 words of shape (..., W).
+
+    Bit ``b`` of a state is stored in word ``b // 64`` at position ``b % 64``.
+    """
+
+    states = np.asarray(states)
+    N = states.shape[-1]
+    width = word_count(N) * WORD_BITS
+    padded = np.zeros(states.shape[:-1] + (width,), dtype=np.uint8)
+    padded[..., :N] = states
+    packed_bytes = np.packbits(padded, axis=-1, bitorder="little")
+    return packed_bytes.view("<u8").astype(PACKED_DTYPE)
+
+
+def unpack_states(packed: np.ndarray, N: int) -> np.ndarray:
+    """Inverse of :func:`pack_states`; returns int8 states of shape (..., N)."""
+
+    words = np.ascontiguousarray(np.asarray(packed, dtype=PACKED_DTYPE).astype("<u8"))
+    bits = np.unpackbits(words.view(np.uint8), axis=-1, bitorder="little")
+    return bits[..., :N].astype(np.int8)
+
+
+def bitstring_to_packed(bitstring: str, length: int) -> np.ndarray:
+    return pack_states(bitstring_to_array(bitstring, length))
+
+
+def flip_packed(packed: np.ndarray, bit: int) -> np.ndarray:
+    """Return a copy of ``packed`` with ``bit`` flipped (works on batches too)."""
+
+    flipped = np.array(packed, dtype=PACKED_DTYPE)
+    flipped[..., bit // WORD_BITS] ^= PACKED_DTYPE(1) << PACKED_DTYPE(bit % WORD_BITS)
+    return flipped
+
+
+def packed_equal(a: np.ndarray, b: np.ndarray) -> Union[bool, np.ndarray]:
+    result = np.all(np.asarray(a) == np.asarray(b), axis=-1)
+    return bool(result) if np.ndim(result) == 0 else result
+
+
+def packed_key(packed: np.ndarray) -> bytes:
+    """Hashable key for a single packed state."""
+
+    return np.asarray(packed, dtype=PACKED_DTYPE).tobytes()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .agents import Agent, create_agents
 from .config_loader import ExperimentConfig, LazerSettings, load_experiment_config
@@ -10,10 +12,13 @@ from .lazer2007.game_table import (
     GameTableBuilder,
     GameValueProtocol,
 )
+from .fitness_cache import FitnessCache
 from .landscape import NKLandscape
+from .landscape_store import LandscapeStore
 from .levinthal1997 import LevinthalGameTableBuilder, LevinthalPlayer
 from .local_search import LocalSearchConfig, LocalSearchEngine
 from .networks import NetworkFactory
+from .result_store import CoalitionResultStore
 from .simulation import SimulationConfig, SimulationEngine
 from .ethiraj2004 import (
     build_true_modules,
@@ -39,6 +44,15 @@ def protocol_from_name(name: str) -> GameValueProtocol:
     raise ValueError(f"Unsupported protocol: {name}")
 
 
+def scenario_landscape_seed(exp_config: ExperimentConfig) -> Optional[int]:
+    """Seed of the scenario landscape: ``seeds.landscape``, else ``seeds.random``."""
+
+    # 0 も有効な seed なので `or` ではなく None で判定する
+    if exp_config.landscape_seed is not None:
+        return exp_config.landscape_seed
+    return exp_config.random_seed
+
+
 def build_landscape(exp_config: ExperimentConfig) -> NKLandscape:
     skill_profile = None
     bit_skills = None
@@ -47,16 +61,84 @@ def build_landscape(exp_config: ExperimentConfig) -> NKLandscape:
         skill_profile = exp_config.lazer.skill_profile
         bit_skills = exp_config.lazer.bit_skills
         conflict_pairs = exp_config.lazer.conflict_pairs
-    return NKLandscape.from_random(
+    factory = (
+        NKLandscape.from_procedural
+        if exp_config.landscape_backend == "procedural"
+        else NKLandscape.from_random
+    )
+    return factory(
         N=exp_config.N,
         K=exp_config.K,
-        seed=exp_config.landscape_seed or exp_config.random_seed,
+        seed=scenario_landscape_seed(exp_config),
         skill_profile=skill_profile,
         bit_skills=bit_skills,
         conflict_pairs=conflict_pairs,
     )
 
 
+def build_ethiraj_landscape_from_config(exp_config: ExperimentConfig) -> NKLandscape:
+    if not exp_config.ethiraj:
+        raise ValueError("Ethiraj scenario requires ethiraj settings in config")
+    return build_ethiraj_landscape(
+        N=exp_config.N,
+        K=exp_config.K,
+        true_modules=build_true_modules(exp_config.N, exp_config.ethiraj.true_modules),
+        intra_bias=exp_config.ethiraj.intra_density,
+        inter_bias=exp_config.ethiraj.inter_density,
+        seed=scenario_landscape_seed(exp_config),
+        backend=exp_config.landscape_backend,
+    )
+
+
+def landscape_params(exp_config: ExperimentConfig) -> Dict[str, Any]:
+    """Parameters that fully determine the generated landscape (store hash key)."""
+
+    params: Dict[str, Any] = {
+        "N": exp_config.N,
+        "K": exp_config.K,
+        "seed": scenario_landscape_seed(exp_config),
+    }
+    if exp_config.scenario_type == "ethiraj2004":
+        if not exp_config.ethiraj:
+            raise ValueError("Ethiraj scenario requires ethiraj settings in config")
+        params.update(
+            generator="ethiraj_modular",
+            true_modules=build_true_modules(exp_config.N, exp_config.ethiraj.true_modules),
+            intra_density=exp_config.ethiraj.intra_density,
+            inter_density=exp_config.ethiraj.inter_density,
+        )
+        return params
+    params["generator"] = "nk_random"
+    if getattr(exp_config, "lazer", None):
+        params.update(
+            skill_profile={
+                name: list(bounds) for name, bounds in sorted(exp_config.lazer.skill_profile.items())
+            },
+            bit_skills={str(bit): skill for bit, skill in sorted(exp_config.lazer.bit_skills.items())},
+            conflict_pairs=sorted(sorted(pair) for pair in exp_config.lazer.conflict_pairs),
+        )
+    return params
+
+
+def build_scenario_landscape(
+    exp_config: ExperimentConfig,
+    landscape_cache: str | Path | None = None,
+) -> NKLandscape:
+    """Build the scenario's landscape, reusing the on-disk store when a cache dir is given."""
+
+    if exp_config.scenario_type == "ethiraj2004":
+        factory = lambda: build_ethiraj_landscape_from_config(exp_config)  # noqa: E731
+    else:
+        factory = lambda: build_landscape(exp_config)  # noqa: E731
+    if landscape_cache is None or exp_config.landscape_backend == "procedural":
+        # procedural 表は seed から即座に再生成できるのでディスクに保存しない
+        return factory()
+    if scenario_landscape_seed(exp_config) is None:
+        # seed なしは毎回新しいランドスケープを引く設定なので、保存済みのものを返してはいけない
+        return factory()
+    return LandscapeStore(landscape_cache).get_or_build(landscape_params(exp_config), factory)
+
+
 def build_agents(exp_config: ExperimentConfig) -> list[Agent]:
     agents = create_agents(exp_config.N)
     if getattr(exp_config, "lazer", None) and exp_config.lazer.bit_skills:
@@ -76,38 +158,90 @@ def build_simulation_config(exp_config: ExperimentConfig) -> SimulationConfig:
     return exp_config.to_simulation_config()
 
 
+def build_fitness_cache(
+    exp_config: ExperimentConfig, landscape: NKLandscape
+) -> Optional[FitnessCache]:
+    """Shared LRU fitness cache for one table build (disabled unless configured)."""
+
+    if not exp_config.fitness_cache_size:
+        return None
+    return FitnessCache(landscape, capacity=exp_config.fitness_cache_size)
+
+
 def run_experiment(
     config_path: str | Path,
     *,
     output_override: str | Path | None = None,
     max_coalition_size: Optional[int] = None,
+    landscape_cache: str | Path | None = None,
+    workers: Optional[int] = None,
+    checkpoint: str | Path | None = None,
+    resume: bool = False,
 ) -> Tuple[Path, int]:
+    """Build one game table.
+
+    With ``checkpoint`` (or ``resume``) finished coalitions of the Lazer and
+    Levinthal builders are recorded in a :class:`CoalitionResultStore`;
+    ``resume`` reuses the stored ones, so an interrupted build continues where
+    it stopped (``seeds.random`` must be fixed for the keys to match).
+    """
+
     exp = load_experiment_config(config_path)
-    if exp.scenario_type == "levinthal1997":
-        return _run_levinthal_experiment(
-            exp, output_override=output_override, max_coalition_size=max_coalition_size
-        )
+    if workers is not None:
+        exp.workers = workers
+    landscape = build_scenario_landscape(exp, landscape_cache)
     if exp.scenario_type == "ethiraj2004":
         return _run_ethiraj_experiment(
-            exp, output_override=output_override, max_coalition_size=max_coalition_size
+            exp,
+            landscape,
+            output_override=output_override,
+            max_coalition_size=max_coalition_size,
         )
-    else:
-        return _run_lazer_experiment(
-            exp, output_override=output_override, max_coalition_size=max_coalition_size
+    store_path = checkpoint_path(exp, checkpoint, resume)
+    result_store = CoalitionResultStore(store_path) if store_path is not None else None
+    try:
+        run = _run_levinthal_experiment if exp.scenario_type == "levinthal1997" else _run_lazer_experiment
+        return run(
+            exp,
+            landscape,
+            output_override=output_override,
+            max_coalition_size=max_coalition_size,
+            result_store=result_store,
+            resume=resume,
         )
+    finally:
+        if result_store is not None:
+            result_store.close()
+
+
+def checkpoint_path(
+    exp: ExperimentConfig,
+    checkpoint: str | Path | None,
+    resume: bool,
+) -> Optional[Path]:
+    """Result-store file of a build (default ``outputs/checkpoints/<scenario>.sqlite`` when resuming)."""
+
+    if checkpoint is not None:
+        return Path(checkpoint)
+    if resume:
+        return Path("outputs/checkpoints") / f"{exp.scenario_type}.sqlite"
+    return None
 
 
 def _run_lazer_experiment(
     exp: ExperimentConfig,
+    landscape: NKLandscape,
     *,
     output_override: str | Path | None,
     max_coalition_size: Optional[int],
+    result_store: Optional[CoalitionResultStore] = None,
+    resume: bool = False,
 ) -> Tuple[Path, int]:
-    landscape = build_landscape(exp)
     agents = build_agents(exp)
     graph = build_network(exp, len(agents))
     sim_config = build_simulation_config(exp)
     protocol = protocol_from_name(exp.protocol)
+    fitness_cache = build_fitness_cache(exp, landscape)
 
     notes = (
         f"scenario=lazer2007;N={exp.N};K={exp.K};"
@@ -126,6 +260,12 @@ def _run_lazer_experiment(
         protocol=protocol,
         rng_seed=exp.random_seed,
         notes=notes,
+        fitness_cache=fitness_cache,
+        adaptive=exp.adaptive,
+        decompose=exp.decompose_components,
+        workers=exp.workers,
+        result_store=result_store,
+        resume=resume,
     )
     target_max_size = max_coalition_size or exp.max_coalition_size
     df = builder.build_table(max_size=target_max_size)
@@ -143,6 +283,7 @@ def _run_lazer_experiment(
         agents=agents,
         graph=graph,
         config=sim_config,
+        fitness_cache=fitness_cache,
     )
     demo_result = demo_engine.run()
     plot_lazer_dynamics(demo_result.history, Path("outputs/figures") / exp.scenario_type)
@@ -151,13 +292,15 @@ def _run_lazer_experiment(
 
 def _run_levinthal_experiment(
     exp: ExperimentConfig,
+    landscape: NKLandscape,
     *,
     output_override: str | Path | None,
     max_coalition_size: Optional[int],
+    result_store: Optional[CoalitionResultStore] = None,
+    resume: bool = False,
 ) -> Tuple[Path, int]:
     if not exp.levinthal:
         raise ValueError("Levinthal scenario requires search settings in config")
-    landscape = build_landscape(exp)
     baseline_state = bitstring_to_array(exp.levinthal.baseline_state, exp.N)
     players = _build_players(exp)
     search_config = LocalSearchConfig(
@@ -167,8 +310,11 @@ def _run_levinthal_experiment(
         init_strategy=exp.levinthal.init_strategy,  # type: ignore[arg-type]
         perturb_prob=exp.levinthal.perturb_prob,
         rng_seed=exp.random_seed,
+        batch_trials=exp.levinthal.batch_trials,
+        strategy=exp.levinthal.strategy,  # type: ignore[arg-type]
     )
     trials = exp.runs if exp.runs > 0 else 1
+    fitness_cache = build_fitness_cache(exp, landscape)
     builder = LevinthalGameTableBuilder(
         landscape=landscape,
         baseline_state=baseline_state,
@@ -176,6 +322,13 @@ def _run_levinthal_experiment(
         search_config=search_config,
         trials=trials,
         rng_seed=exp.random_seed,
+        fitness_cache=fitness_cache,
+        exact_max_bits=exp.levinthal.exact_max_bits,
+        workers=exp.workers,
+        adaptive=exp.adaptive,
+        dedupe=exp.levinthal.dedupe,
+        result_store=result_store,
+        resume=resume,
     )
     target_max_size = max_coalition_size or exp.max_coalition_size
     df = builder.build_table(max_size=target_max_size)
@@ -194,6 +347,7 @@ def _run_levinthal_experiment(
         free_bits=list(range(exp.N)),
         config=search_config,
         rng_seed=exp.random_seed,
+        fitness_cache=fitness_cache,
     )
     _, history = demo_engine.run_with_history()
     plot_levinthal_path(history, Path("outputs/figures") / exp.scenario_type)
@@ -203,6 +357,7 @@ def _run_levinthal_experiment(
 
 def _run_ethiraj_experiment(
     exp: ExperimentConfig,
+    landscape: NKLandscape,
     *,
     output_override: str | Path | None,
     max_coalition_size: Optional[int],
@@ -211,17 +366,10 @@ def _run_ethiraj_experiment(
         raise ValueError("Ethiraj scenario requires ethiraj settings in config")
     true_modules = build_true_modules(exp.N, exp.ethiraj.true_modules)
     designer_modules = build_designer_modules(exp.N, exp.ethiraj.designer_modules)
-    landscape = build_ethiraj_landscape(
-        N=exp.N,
-        K=exp.K,
-        true_modules=true_modules,
-        intra_bias=exp.ethiraj.intra_density,
-        inter_bias=exp.ethiraj.inter_density,
-        seed=exp.landscape_seed or exp.random_seed,
-    )
     baseline_state = bitstring_to_array(exp.ethiraj.baseline_state, exp.N)
     # R ラン分のダイナミクスを独立に回し、それぞれの成熟設計候補 d* を集める
     run_count = exp.runs if exp.runs > 0 else 1
+    fitness_cache = build_fitness_cache(exp, landscape)
     mature_states: List[np.ndarray] = []
     demo_history: Optional[List[dict[str, float]]] = None
     for run_idx in range(run_count):
@@ -231,12 +379,15 @@ def _run_ethiraj_experiment(
             num_firms=exp.ethiraj.firms,
             baseline_state=baseline_state,
             rng_seed=(exp.random_seed or 0) + run_idx,
+            fitness_cache=fitness_cache,
         )
         sim_result = run_ethiraj_simulation(
             population=population,
             rounds=exp.ethiraj.rounds,
             recombination_interval=exp.ethiraj.recombination_interval,
             recombination_mode=exp.ethiraj.recombination_mode,
+            # 可視化に使うのは最初の run の履歴だけ
+            history="per_round" if run_idx == 0 else "none",
         )
         mature_states.append(sim_result.best_state)
         if demo_history is None:
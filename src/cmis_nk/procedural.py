@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# パターン index は下位 40 ビット、ビット番号はその上に詰めて 1 つのカウンタにする
+PATTERN_BITS = 40
+MAX_PROCEDURAL_WIDTH = PATTERN_BITS
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_NO_CONFLICT = np.int64(1) << np.int64(62)  # どのパターン index にも立たないビット
+
+
+def _mix64(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer applied elementwise to uint64 arrays (wrapping arithmetic)."""
+
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX2
+    return values ^ (values >> np.uint64(31))
+
+
+class ProceduralTables(Sequence[np.ndarray]):
+    """Contribution tables derived on demand from a counter-based hash.
+
+    ``f_i(pattern)`` is ``low_i + (high_i - low_i) * u`` where ``u`` in [0, 1) is
+    SplitMix64 of ``(seed, i, pattern)``; patterns where a conflict pair is (1, 1)
+    are halved as in :meth:`NKLandscape._generate_table`. Only the per-bit ranges
+    and conflict masks are stored, so memory is O(N * K) instead of O(N * 2^(K+1)).
+    Indexing (``tables[i]``) materializes one dense table for compatibility.
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        widths: Sequence[int],
+        ranges: Sequence[Tuple[float, float]],
+        conflict_masks: Optional[Sequence[Sequence[int]]] = None,
+    ) -> None:
+        if len(widths) != len(ranges):
+            raise ValueError("widths and ranges must have the same length")
+        if max(widths, default=1) > MAX_PROCEDURAL_WIDTH:
+            raise ValueError(f"procedural tables support K + 1 <= {MAX_PROCEDURAL_WIDTH}")
+        self.seed = int(seed)
+        self.widths = np.asarray(widths, dtype=np.int64)
+        bounds = np.asarray(ranges, dtype=float).reshape(len(widths), 2)
+        self._low = bounds[:, 0]
+        self._span = bounds[:, 1] - bounds[:, 0]
+        masks = [list(row) for row in (conflict_masks or [[] for _ in widths])]
+        max_masks = max((len(row) for row in masks), default=0)
+        self._conflict_masks = np.full((len(widths), max_masks), _NO_CONFLICT, dtype=np.int64)
+        for row, row_masks in enumerate(masks):
+            self._conflict_masks[row, : len(row_masks)] = row_masks
+        self._seed_key = _mix64(np.array([self.seed], dtype=np.uint64) ^ _GOLDEN)[0]
+
+    def __len__(self) -> int:
+        return len(self.widths)
+
+    def __getitem__(self, idx: int) -> np.ndarray:  # type: ignore[override]
+        patterns = np.arange(2 ** int(self.widths[idx]), dtype=np.int64)
+        return self.lookup(np.full(patterns.size, idx, dtype=np.intp), patterns)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def lookup(self, rows: np.ndarray, patterns: np.ndarray) -> np.ndarray:
+        """Contribution values for broadcastable arrays of row and pattern indices."""
+
+        rows, patterns = np.broadcast_arrays(
+            np.asarray(rows, dtype=np.intp), np.asarray(patterns, dtype=np.int64)
+        )
+        counter = (rows.astype(np.uint64) << np.uint64(PATTERN_BITS)) | patterns.astype(np.uint64)
+        hashed = _mix64(_mix64(counter ^ self._seed_key) + _GOLDEN)
+        # 上位 53 ビットから [0, 1) の倍精度一様乱数を作る
+        uniform = (hashed >> np.uint64(11)).astype(float) * (1.0 / (1 << 53))
+        values = self._low[rows] + self._span[rows] * uniform
+        if self._conflict_masks.shape[1]:
+            masks = self._conflict_masks[rows]
+            conflict = ((patterns[..., np.newaxis] & masks) == masks).any(axis=-1)
+            values = np.where(conflict, values * 0.5, values)  # penalize conflicting combinations
+        return values
+
+    @staticmethod
+    def conflict_masks_for(
+        local_bits: Sequence[int],
+        conflict_pairs: Optional[Sequence[Tuple[int, int]]],
+    ) -> List[int]:
+        """Pattern-index bitmasks of the conflict pairs that fall inside ``local_bits``."""
+
+        if not conflict_pairs:
+            return []
+        width = len(local_bits)
+        positions: Dict[int, int] = {bit: pos for pos, bit in enumerate(local_bits)}
+        masks = []
+        for a, b in sorted(conflict_pairs):
+            if a in positions and b in positions:
+                masks.append((1 << (width - 1 - positions[a])) | (1 << (width - 1 - positions[b])))
+        return masks
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+# (mean, std, runs, notes suffix)
+StoredOutcome = Tuple[float, float, int, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS coalition_results (
+    landscape_hash TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    coalition_mask TEXT NOT NULL,
+    seed_key TEXT NOT NULL,
+    mean_value REAL NOT NULL,
+    std_value REAL NOT NULL,
+    runs INTEGER NOT NULL,
+    notes TEXT NOT NULL,
+    PRIMARY KEY (landscape_hash, config_hash, coalition_mask, seed_key)
+)
+"""
+
+
+def config_hash(payload: Any) -> str:
+    """Stable SHA-256 of a JSON-like payload (dataclasses are expanded)."""
+
+    def normalize(value: Any) -> Any:
+        if dataclasses.is_dataclass(value) and not isinstance(value, type):
+            return normalize(dataclasses.asdict(value))
+        if isinstance(value, dict):
+            return {str(key): normalize(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple, set, frozenset)):
+            items = [normalize(item) for item in value]
+            return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+        return value
+
+    text = json.dumps(normalize(payload), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CoalitionResultStore:
+    """SQLite store of finished coalition outcomes for resumable table builds.
+
+    Rows are keyed by (landscape hash, scenario config hash, coalition bitmask,
+    seed key). Writes are buffered and committed every ``batch_size`` rows; with
+    ``synchronous=FULL`` each commit is one fsync, so a crash loses at most the
+    current batch. Use as a context manager so the last batch is flushed.
+    """
+
+    def __init__(self, path: str | Path, batch_size: int = 64) -> None:
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=FULL")
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+        self._pending: List[Tuple[Any, ...]] = []
+
+    def load(self, landscape_key: str, config_key: str) -> Dict[Tuple[int, str], StoredOutcome]:
+        """All stored outcomes of one build, keyed by (coalition bitmask, seed key)."""
+
+        self.flush()
+        rows = self._connection.execute(
+            "SELECT coalition_mask, seed_key, mean_value, std_value, runs, notes "
+            "FROM coalition_results WHERE landscape_hash = ? AND config_hash = ?",
+            (landscape_key, config_key),
+        )
+        # ビットマスクは 64 ビットを超えうるので文字列で保存している
+        return {
+            (int(mask), seed_key): (float(mean), float(std), int(runs), str(notes))
+            for mask, seed_key, mean, std, runs, notes in rows
+        }
+
+    def put(
+        self,
+        landscape_key: str,
+        config_key: str,
+        coalition_mask: int,
+        seed_key: str,
+        outcome: StoredOutcome,
+    ) -> None:
+        mean_value, std_value, runs, notes = outcome
+        self._pending.append(
+            (
+                landscape_key,
+                config_key,
+                str(coalition_mask),
+                seed_key,
+                float(mean_value),
+                float(std_value),
+                int(runs),
+                notes,
+            )
+        )
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO coalition_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+        self._pending.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self) -> "CoalitionResultStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def coalition_mask(indices: Iterable[int]) -> int:
+    """Bitmask of player indices (bit ``i`` set when player ``i`` is in the coalition)."""
+
+    return sum(1 << int(idx) for idx in indices)
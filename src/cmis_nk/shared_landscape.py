@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .landscape import ConflictPairs, NKLandscape, SkillProfile
+
+
+@dataclass
+class SharedLandscapeHandle:
+    """Picklable reference to a landscape whose table matrix lives in shared memory."""
+
+    name: str
+    shape: Tuple[int, int]
+    dtype: str
+    N: int
+    K: int
+    dependencies: List[List[int]]
+    skill_profile: Optional[SkillProfile] = None
+    bit_skills: Optional[Dict[int, str]] = None
+    conflict_pairs: Optional[ConflictPairs] = None
+
+    def attach(self) -> Tuple[NKLandscape, shared_memory.SharedMemory]:
+        """Rebuild the landscape on top of the shared block (no table copy).
+
+        The caller must keep the returned ``SharedMemory`` alive as long as the
+        landscape is used.
+        """
+
+        block = shared_memory.SharedMemory(name=self.name)
+        matrix = np.ndarray(self.shape, dtype=np.dtype(self.dtype), buffer=block.buf)
+        matrix.flags.writeable = False
+        landscape = NKLandscape(
+            N=self.N,
+            K=self.K,
+            dependencies=self.dependencies,
+            tables=matrix,
+            skill_profile=self.skill_profile,
+            bit_skills=self.bit_skills,
+            conflict_pairs=self.conflict_pairs,
+        )
+        return landscape, block
+
+
+class SharedLandscape:
+    """Publish a landscape's table matrix once for all worker processes.
+
+    Use as a context manager; the block is unlinked on exit. ``payload`` is what
+    workers receive: a :class:`SharedLandscapeHandle`, or the landscape itself
+    when there is nothing worth sharing (procedural tables or rows of different
+    widths, which the landscape cannot wrap without copying).
+    """
+
+    def __init__(self, landscape: NKLandscape) -> None:
+        self.landscape = landscape
+        self._block: Optional[shared_memory.SharedMemory] = None
+        self.payload: NKLandscape | SharedLandscapeHandle = landscape
+
+    @staticmethod
+    def supports(landscape: NKLandscape) -> bool:
+        widths = {len(deps) for deps in landscape.dependencies}
+        return not landscape.is_procedural and len(widths) <= 1
+
+    def __enter__(self) -> "SharedLandscape":
+        if not self.supports(self.landscape):
+            return self
+        matrix = np.ascontiguousarray(self.landscape._table_matrix)
+        self._block = shared_memory.SharedMemory(create=True, size=max(1, matrix.nbytes))
+        np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=self._block.buf)[...] = matrix
+        self.payload = SharedLandscapeHandle(
+            name=self._block.name,
+            shape=matrix.shape,
+            dtype=matrix.dtype.str,
+            N=self.landscape.N,
+            K=self.landscape.K,
+            dependencies=[list(deps) for deps in self.landscape.dependencies],
+            skill_profile=self.landscape.skill_profile,
+            bit_skills=self.landscape.bit_skills,
+            conflict_pairs=self.landscape.conflict_pairs,
+        )
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+        self.payload = self.landscape
+
+
+def attach_landscape(
+    payload: NKLandscape | SharedLandscapeHandle,
+) -> Tuple[NKLandscape, Optional[shared_memory.SharedMemory]]:
+    """Landscape for a worker from :attr:`SharedLandscape.payload`."""
+
+    if isinstance(payload, SharedLandscapeHandle):
+        return payload.attach()
+    return payload, None
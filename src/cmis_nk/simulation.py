@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Literal, Optional
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
 
 import networkx as nx
 import numpy as np
 
 from .agents import Agent, initialize_states
+from .common.history import HistoryLevel, HistoryRecorder, HistoryTrace
+from .fitness_cache import FitnessCache
 from .landscape import NKLandscape
+from .networks import CompiledGraph, as_compiled_graph
 
 
 @dataclass
@@ -19,6 +22,16 @@ class SimulationConfig:
     mode: Literal["generic", "lf_pure"] = "generic"
     rng_seed: Optional[int] = None
     accept_equal: bool = True
+    # reference: エージェントごとの逐次実装 / array: (A, N) 行列と CSR 隣接による一括実装
+    backend: Literal["reference", "array"] = "reference"
+    # 証明可能な不動点（どの乱数でも状態が変わらない状態）に達したら残りのラウンドを埋めて打ち切る
+    detect_convergence: bool = True
+    # 確率的な設定向けの打ち切り（opt-in, 近似）: 状態が stall_rounds ラウンド連続で変わらなければ停止
+    stall_rounds: Optional[int] = None
+    # 履歴の記録粒度: none / summary（最終ラウンドのみ）/ per_round（history_stride ごと + 最終ラウンド）
+    history: HistoryLevel = "per_round"
+    history_stride: int = 1
+    record_agent_scores: bool = False
 
     @classmethod
     def lf_pure(cls, rounds: int = 200, rng_seed: Optional[int] = None) -> "SimulationConfig":
@@ -39,6 +52,10 @@ class SimulationResult:
     final_scores: Dict[int, float]
     best_score: float
     best_state: Optional[np.ndarray]
+    # 以降の状態が変わらない最初のラウンド（打ち切らなかった場合は None）
+    converged_at: Optional[int] = None
+    # 記録したラウンドの列形式の履歴（history はこれを行形式にしたもの）
+    trace: Optional[HistoryTrace] = None
 
 
 class SimulationEngine:
@@ -48,67 +65,145 @@ class SimulationEngine:
         self,
         landscape: NKLandscape,
         agents: List[Agent],
-        graph: nx.Graph,
+        graph: nx.Graph | CompiledGraph,
         config: SimulationConfig,
         initial_states: Optional[Dict[int, np.ndarray]] = None,
+        fitness_cache: Optional[FitnessCache] = None,
     ) -> None:
         self.landscape = landscape
         self.agents = agents
-        self.graph = graph
+        # 近傍参照はラウンドごとに全エージェント分行うため、networkx のグラフはタプル隣接に変換しておく
+        self.graph = as_compiled_graph(graph)
         self.config = config
+        self.fitness_cache = fitness_cache
+        self._evaluate = fitness_cache.evaluate if fitness_cache is not None else landscape.evaluate
         self.rng = np.random.default_rng(config.rng_seed)
+        if config.backend not in ("reference", "array"):
+            raise ValueError(f"Unsupported simulation backend: {config.backend}")
+        if config.stall_rounds is not None and config.stall_rounds < 1:
+            raise ValueError("stall_rounds must be positive")
+        if config.history_stride < 1:
+            raise ValueError("history_stride must be positive")
         if initial_states is None:
             self.states = initialize_states(agents, landscape.N, seed=config.rng_seed)
         else:
             self.states = {aid: state.copy() for aid, state in initial_states.items()}
 
     def run(self) -> SimulationResult:
+        if self.config.backend == "array":
+            # simulation_array は本モジュールの型を使うため実行時に読み込む
+            from .simulation_array import ArraySimulationEngine
+
+            return ArraySimulationEngine(
+                landscape=self.landscape,
+                agents=self.agents,
+                graph=self.graph,
+                config=self.config,
+                initial_states=self.states,
+                fitness_cache=self.fitness_cache,
+            ).run()
         states = {aid: state.copy() for aid, state in self.states.items()}
-        history: List[Dict[str, float]] = []
+        # 各エージェントは現在の状態のスコアを持ち回り、ラウンドごとの全再評価を行わない
+        scores = self._evaluate_scores(states)
+        recorder = HistoryRecorder(
+            self.config.rounds,
+            level=self.config.history,
+            stride=self.config.history_stride,
+            num_agents=len(scores),
+            agent_scores=self.config.record_agent_scores,
+        )
         best_score = float("-inf")
         best_state: Optional[np.ndarray] = None
+        converged_at: Optional[int] = None
+        unchanged_rounds = 0
+        checked = False  # 現在の状態について不動点判定を済ませたか
         for round_idx in range(self.config.rounds):
-            states = self._run_round(states)
-            score_map = self._evaluate_scores(states)
-            if score_map:
-                round_mean = float(np.mean(list(score_map.values())))
-                round_max = float(np.max(list(score_map.values())))
-                best_agent = max(score_map, key=score_map.get)
+            next_states, scores = self._run_round(states, scores)
+            # 状態を変えないエージェントは同じ配列オブジェクトを返す
+            changed = any(next_states[aid] is not states.get(aid) for aid in next_states)
+            states = next_states
+            score_values = np.fromiter(scores.values(), dtype=float, count=len(scores))
+            if scores:
+                round_max = float(np.max(score_values))
                 if round_max > best_score:
                     best_score = round_max
-                    best_state = states[best_agent].copy()
-            else:
-                round_mean = 0.0
-                round_max = 0.0
-            history.append(
-                {
-                    "round": float(round_idx),
-                    "mean_score": round_mean,
-                    "max_score": round_max,
-                }
-            )
-        final_scores = self._evaluate_scores(states)
+                    best_state = states[max(scores, key=scores.get)].copy()
+            recorder.record(round_idx, score_values)
+            if changed:
+                unchanged_rounds, checked = 0, False
+                continue
+            unchanged_rounds += 1
+            stalled = self.config.stall_rounds is not None and unchanged_rounds >= self.config.stall_rounds
+            if not stalled:
+                if checked or not self.config.detect_convergence:
+                    continue
+                checked = True
+                if not self._is_fixed_point(states, scores):
+                    continue
+            # 以降のラウンドは状態・スコアとも変わらないので履歴をそのまま延長する
+            converged_at = max(round_idx - unchanged_rounds, 0)
+            recorder.record_through(round_idx + 1, score_values)
+            break
+        trace = recorder.trace()
         return SimulationResult(
-            history=history,
-            final_scores=final_scores,
+            history=trace.to_records(),
+            final_scores=dict(scores),
             best_score=best_score if best_score > float("-inf") else 0.0,
             best_state=best_state,
+            converged_at=converged_at,
+            trace=trace,
         )
 
-    def _run_round(self, states: Dict[int, np.ndarray]) -> Dict[int, np.ndarray]:
-        current_scores = self._evaluate_scores(states)
+    def _is_fixed_point(self, states: Dict[int, np.ndarray], scores: Dict[int, float]) -> bool:
+        """True when no draw of the next round can change any state.
+
+        That holds if no agent has a strictly fitter neighbor to imitate (or
+        agents never observe) and no single flip in any agent's search space
+        would be accepted.
+        """
+
+        agent_ids = [agent.agent_id for agent in self.agents if agent.agent_id in states]
+        if self.config.velocity > 0 and any(
+            self._best_neighbor(agent_id, scores) is not None for agent_id in agent_ids
+        ):
+            return False
+        candidates: List[np.ndarray] = []
+        current: List[float] = []
+        for agent in self.agents:
+            state = states.get(agent.agent_id)
+            if state is None:
+                continue
+            space = self._search_space(agent)
+            block = np.repeat(state[np.newaxis, :], len(space), axis=0)
+            rows = np.arange(len(space))
+            block[rows, space] = 1 - block[rows, space]
+            candidates.append(block)
+            current.extend([scores[agent.agent_id]] * len(space))
+        if not candidates:
+            return True
+        fitness = self.landscape.evaluate_many(np.concatenate(candidates))
+        if self.config.accept_equal:
+            return not np.any(fitness >= np.asarray(current))
+        return not np.any(fitness > np.asarray(current))
+
+    def _run_round(
+        self,
+        states: Dict[int, np.ndarray],
+        scores: Dict[int, float],
+    ) -> Tuple[Dict[int, np.ndarray], Dict[int, float]]:
         next_states: Dict[int, np.ndarray] = {}
+        next_scores: Dict[int, float] = {}
         for agent in self.agents:
             current_state = states.get(agent.agent_id)
             if current_state is None:
                 continue
-            next_states[agent.agent_id] = self._update_agent(
+            next_states[agent.agent_id], next_scores[agent.agent_id] = self._update_agent(
                 agent,
                 current_state,
                 states,
-                current_scores,
+                scores,
             )
-        return next_states
+        return next_states, next_scores
 
     def _update_agent(
         self,
@@ -116,29 +211,39 @@ class SimulationEngine:
         current_state: np.ndarray,
         states: Dict[int, np.ndarray],
         score_map: Dict[int, float],
-    ) -> np.ndarray:
+    ) -> Tuple[np.ndarray, float]:
+        """Return the agent's next state together with its fitness."""
+
         observe = self.rng.random() < self.config.velocity
         if observe:
-            best_neighbor_state = self._best_neighbor_state(agent.agent_id, states, score_map)
-            if best_neighbor_state is not None:
-                return self._mimic_state(current_state, best_neighbor_state)
+            best_neighbor = self._best_neighbor(agent.agent_id, score_map)
+            if best_neighbor is not None:
+                new_state = self._mimic_state(current_state, states[best_neighbor])
+                if self.config.error_rate <= 0:
+                    # 誤りなしの模倣は模倣元と同じ状態なので、既知のスコアをそのまま引き継ぐ
+                    return new_state, score_map[best_neighbor]
+                return new_state, float(self._evaluate(new_state))
         return self._local_search(agent, current_state, score_map.get(agent.agent_id, 0.0))
 
-    def _best_neighbor_state(
-        self,
-        agent_id: int,
-        states: Dict[int, np.ndarray],
-        score_map: Dict[int, float],
-    ) -> Optional[np.ndarray]:
+    def _best_neighbor(self, agent_id: int, score_map: Dict[int, float]) -> Optional[int]:
         own_score = score_map.get(agent_id, float("-inf"))
-        best_state: Optional[np.ndarray] = None
+        best_neighbor: Optional[int] = None
         best_score = own_score
         for neighbor in self.graph.neighbors(agent_id):
             neighbor_score = score_map.get(neighbor, float("-inf"))
             if neighbor_score > best_score:
                 best_score = neighbor_score
-                best_state = states[neighbor]
-        return best_state
+                best_neighbor = neighbor
+        return best_neighbor
+
+    def _best_neighbor_state(
+        self,
+        agent_id: int,
+        states: Dict[int, np.ndarray],
+        score_map: Dict[int, float],
+    ) -> Optional[np.ndarray]:
+        best_neighbor = self._best_neighbor(agent_id, score_map)
+        return states[best_neighbor] if best_neighbor is not None else None
 
     def _mimic_state(
         self,
@@ -158,33 +263,35 @@ class SimulationEngine:
         agent: Agent,
         current_state: np.ndarray,
         current_score: float,
-    ) -> np.ndarray:
+    ) -> Tuple[np.ndarray, float]:
         candidate = current_state.copy()
-        if self.config.local_search_scope == "assigned" and agent.bits:
-            search_space = agent.bits
-        else:
-            search_space = list(range(self.landscape.N))
-        bit = int(self.rng.choice(search_space))
+        bit = int(self.rng.choice(self._search_space(agent)))
         candidate[bit] = 1 - candidate[bit]
-        new_score = self.landscape.evaluate(candidate)
+        new_score = float(self._evaluate(candidate))
         if self.config.accept_equal:
             accept = new_score >= current_score
         else:
             accept = new_score > current_score
         if accept:
-            return candidate
-        return current_state
+            return candidate, new_score
+        return current_state, current_score
+
+    def _search_space(self, agent: Agent) -> List[int]:
+        if self.config.local_search_scope == "assigned" and agent.bits:
+            return list(agent.bits)
+        return list(range(self.landscape.N))
 
     def _evaluate_scores(self, states: Dict[int, np.ndarray]) -> Dict[int, float]:
         return {
-            agent_id: float(self.landscape.evaluate(state))
+            agent_id: float(self._evaluate(state))
             for agent_id, state in states.items()
         }
 
-    def clone_with_graph(self, graph: nx.Graph) -> "SimulationEngine":
+    def clone_with_graph(self, graph: nx.Graph | CompiledGraph) -> "SimulationEngine":
         return SimulationEngine(
             landscape=self.landscape,
             agents=self.agents,
             graph=graph,
             config=self.config,
+            fitness_cache=self.fitness_cache,
         )
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import networkx as nx
+import numpy as np
+
+from .agents import Agent, initialize_states
+from .common.history import HistoryRecorder
+from .fitness_cache import FitnessCache
+from .landscape import NKLandscape
+from .networks import CompiledGraph
+from .simulation import SimulationConfig, SimulationResult
+
+
+@dataclass
+class CSRAdjacency:
+    """Neighbor lists of the agents (by position) as CSR index arrays."""
+
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph | CompiledGraph, agent_ids: Sequence[int]) -> "CSRAdjacency":
+        # 近傍の並びは graph.neighbors の順序を保つ（同点時に先頭を選ぶ参照実装と一致させるため）
+        position = {agent_id: idx for idx, agent_id in enumerate(agent_ids)}
+        indptr = [0]
+        indices: List[int] = []
+        for agent_id in agent_ids:
+            if graph.has_node(agent_id):
+                indices.extend(position[nb] for nb in graph.neighbors(agent_id) if nb in position)
+            indptr.append(len(indices))
+        return cls(
+            indptr=np.asarray(indptr, dtype=np.intp),
+            indices=np.asarray(indices, dtype=np.intp),
+        )
+
+    @property
+    def degrees(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def best_neighbors(self, scores: np.ndarray) -> np.ndarray:
+        """Position of each agent's best strictly-fitter neighbor, or -1 (segmented argmax).
+
+        ``scores`` has shape (..., A); ties between neighbors go to the first one
+        in neighbor order, as in :meth:`SimulationEngine._best_neighbor_state`.
+        """
+
+        result = np.full(scores.shape, -1, dtype=np.intp)
+        if self.indices.size == 0:
+            return result
+        degrees = self.degrees
+        nonempty = np.flatnonzero(degrees > 0)
+        starts = self.indptr[nonempty]
+        neighbor_scores = scores[..., self.indices]
+        segment_max = np.maximum.reduceat(neighbor_scores, starts, axis=-1)
+        owner = np.repeat(np.arange(degrees.size), degrees)
+        full_max = np.full(scores.shape, -np.inf)
+        full_max[..., nonempty] = segment_max
+        edge_positions = np.where(
+            neighbor_scores == full_max[..., owner],
+            np.arange(self.indices.size),
+            self.indices.size,
+        )
+        first = np.minimum.reduceat(edge_positions, starts, axis=-1)
+        better = segment_max > scores[..., nonempty]
+        result[..., nonempty] = np.where(better, self.indices[first], -1)
+        return result
+
+
+class ArraySimulationEngine:
+    """Matrix implementation of :class:`SimulationEngine` (``config.backend == "array"``).
+
+    States of R independent runs live in one (R, A, N) int8 tensor and each
+    round is a handful of masked tensor operations: a segmented argmax over the
+    shared CSR adjacency for imitation and one batched evaluation for all
+    local-search candidates. Every run has its own generator and draws its
+    random numbers per round (observation, copy errors, bit choice), so run ``r``
+    of a batch equals a single-run engine seeded with ``rng_seeds[r]``. The
+    dynamics are those of the reference engine, but runs are not draw-for-draw
+    identical to ``backend="reference"``.
+    """
+
+    def __init__(
+        self,
+        landscape: NKLandscape,
+        agents: List[Agent],
+        graph: nx.Graph | CompiledGraph,
+        config: SimulationConfig,
+        initial_states: Optional[Dict[int, np.ndarray]] = None,
+        fitness_cache: Optional[FitnessCache] = None,
+        rng_seeds: Optional[Sequence[Optional[int]]] = None,
+    ) -> None:
+        seeds = list(rng_seeds) if rng_seeds is not None else [config.rng_seed]
+        if config.stall_rounds is not None and config.stall_rounds < 1:
+            raise ValueError("stall_rounds must be positive")
+        if config.history_stride < 1:
+            raise ValueError("history_stride must be positive")
+        if initial_states is not None and len(seeds) != 1:
+            raise ValueError("initial_states can only be given for a single run")
+        self.landscape = landscape
+        self.config = config
+        self.rngs = [np.random.default_rng(seed) for seed in seeds]
+        run_states = (
+            [initial_states]
+            if initial_states is not None
+            else [initialize_states(agents, landscape.N, seed=seed) for seed in seeds]
+        )
+        self.agents = [agent for agent in agents if agent.agent_id in run_states[0]]
+        self.agent_ids = [agent.agent_id for agent in self.agents]
+        self.states = np.array(
+            [[states[agent_id] for agent_id in self.agent_ids] for states in run_states],
+            dtype=np.int8,
+        ).reshape(len(seeds), len(self.agents), landscape.N)
+        self.adjacency = CSRAdjacency.from_graph(graph, self.agent_ids)
+        self._evaluate_many = (
+            fitness_cache.evaluate_many if fitness_cache is not None else landscape.evaluate_many
+        )
+        # 局所探索の候補ビット: (A, S) にパディングし、長さ別に一様抽出する
+        spaces = [
+            agent.bits if config.local_search_scope == "assigned" and agent.bits else range(landscape.N)
+            for agent in self.agents
+        ]
+        width = max((len(space) for space in spaces), default=1)
+        self._space = np.zeros((len(spaces), width), dtype=np.intp)
+        self._space_size = np.array([len(space) for space in spaces], dtype=np.intp)
+        for idx, space in enumerate(spaces):
+            self._space[idx, : len(space)] = list(space)
+        # 不動点判定用: 全エージェントの 1 ビット反転候補を (エージェント位置, ビット) の組で並べる
+        self._flip_agents = np.repeat(np.arange(len(spaces), dtype=np.intp), self._space_size)
+        self._flip_bits = self._space[self._flip_agents, _ranks(self._space_size)]
+
+    @property
+    def num_runs(self) -> int:
+        return len(self.rngs)
+
+    def run(self) -> SimulationResult:
+        if self.num_runs != 1:
+            raise ValueError("run() requires a single-run engine; use run_batch()")
+        return self.run_batch()[0]
+
+    def run_batch(self) -> List[SimulationResult]:
+        """Simulate all runs in lockstep and return one result per run.
+
+        A run leaves the batch once it is at a provable fixed point (or has
+        stalled for ``config.stall_rounds`` rounds); its remaining history is
+        filled with the last round's values.
+        """
+
+        states = self.states.copy()
+        num_runs, num_agents, N = states.shape
+        rounds = self.config.rounds
+        scores = self._scores(states.reshape(-1, N)).reshape(num_runs, num_agents)
+        recorder = HistoryRecorder(
+            rounds,
+            level=self.config.history,
+            stride=self.config.history_stride,
+            num_runs=num_runs,
+            num_agents=num_agents,
+            agent_scores=self.config.record_agent_scores,
+        )
+        final_scores = np.zeros((num_runs, num_agents))
+        best_scores = np.full(num_runs, -np.inf)
+        best_states: List[Optional[np.ndarray]] = [None] * num_runs
+        converged_at: List[Optional[int]] = [None] * num_runs
+        # 以下は未収束の run（active）に揃えた配列
+        active = np.arange(num_runs)
+        unchanged = np.zeros(num_runs, dtype=np.intp)
+        checked = np.zeros(num_runs, dtype=bool)
+        for round_idx in range(rounds):
+            next_states, scores = self._step(states, scores, [self.rngs[run] for run in active])
+            changed = np.any(next_states != states, axis=(1, 2))
+            states = next_states
+            if num_agents:
+                best_agents = np.argmax(scores, axis=1)
+                round_maxes = scores[np.arange(active.size), best_agents]
+                for idx in np.flatnonzero(round_maxes > best_scores[active]):
+                    best_scores[active[idx]] = round_maxes[idx]
+                    best_states[active[idx]] = states[idx, best_agents[idx]].copy()
+            recorder.record(round_idx, scores, runs=active)
+
+            unchanged = np.where(changed, 0, unchanged + 1)
+            checked &= ~changed
+            stop = np.zeros(active.size, dtype=bool)
+            if self.config.stall_rounds is not None:
+                stop |= unchanged >= self.config.stall_rounds
+            if self.config.detect_convergence:
+                pending = np.flatnonzero((unchanged > 0) & ~checked & ~stop)
+                for idx in pending:
+                    stop[idx] = self._is_fixed_point(states[idx], scores[idx])
+                checked[pending] = True
+            if not stop.any():
+                continue
+            for idx in np.flatnonzero(stop):
+                run = active[idx]
+                converged_at[run] = max(round_idx - int(unchanged[idx]), 0)
+                recorder.record_through(round_idx + 1, scores[idx], runs=[run])
+                final_scores[run] = scores[idx]
+            keep = ~stop
+            active, states, scores = active[keep], states[keep], scores[keep]
+            unchanged, checked = unchanged[keep], checked[keep]
+            if not active.size:
+                break
+        final_scores[active] = scores
+        traces = [recorder.trace(run) for run in range(num_runs)]
+        return [
+            SimulationResult(
+                history=traces[run].to_records(),
+                final_scores={
+                    agent_id: float(score) for agent_id, score in zip(self.agent_ids, final_scores[run])
+                },
+                best_score=float(best_scores[run]) if best_scores[run] > -np.inf else 0.0,
+                best_state=best_states[run],
+                converged_at=converged_at[run],
+                trace=traces[run],
+            )
+            for run in range(num_runs)
+        ]
+
+    def _is_fixed_point(self, states: np.ndarray, scores: np.ndarray) -> bool:
+        """Same criterion as :meth:`SimulationEngine._is_fixed_point` for one run's (A, N) states."""
+
+        if self.config.velocity > 0 and np.any(self.adjacency.best_neighbors(scores) >= 0):
+            return False
+        if not self._flip_agents.size:
+            return True
+        candidates = states[self._flip_agents]
+        candidates[np.arange(self._flip_agents.size), self._flip_bits] ^= 1
+        fitness = self.landscape.evaluate_many(candidates)
+        current = scores[self._flip_agents]
+        if self.config.accept_equal:
+            return not np.any(fitness >= current)
+        return not np.any(fitness > current)
+
+    def _scores(self, states: np.ndarray) -> np.ndarray:
+        if not len(states):
+            return np.zeros(0)
+        return np.asarray(self._evaluate_many(states), dtype=float)
+
+    def _step(
+        self,
+        states: np.ndarray,
+        scores: np.ndarray,
+        rngs: Sequence[np.random.Generator],
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Advance the given runs by one round; returns next states and their (carried-over) scores."""
+
+        num_runs, num_agents, N = states.shape
+        if num_agents == 0:
+            return states, scores
+        observe = np.empty((num_runs, num_agents), dtype=bool)
+        choice_draws = np.empty((num_runs, num_agents))
+        error_draws = np.empty((num_runs, num_agents, N)) if self.config.error_rate > 0 else None
+        for run, rng in enumerate(rngs):
+            # 乱数は run ごとに決まった順序で引く（run 数によらず各 run の結果が同じになる）
+            observe[run] = rng.random(num_agents) < self.config.velocity
+            if error_draws is not None:
+                error_draws[run] = rng.random((num_agents, N))
+            choice_draws[run] = rng.random(num_agents)
+
+        best = self.adjacency.best_neighbors(scores)
+        mimic = observe & (best >= 0)
+        next_states = states.copy()
+        next_scores = scores.copy()
+        mimic_runs, mimic_agents = np.nonzero(mimic)
+        if mimic_runs.size:
+            source_agents = best[mimic_runs, mimic_agents]
+            sources = states[mimic_runs, source_agents]
+            if error_draws is None:
+                # 誤りなしの模倣は模倣元のスコアをそのまま引き継ぐ
+                next_states[mimic_runs, mimic_agents] = sources
+                next_scores[mimic_runs, mimic_agents] = scores[mimic_runs, source_agents]
+            else:
+                copy_mask = error_draws[mimic_runs, mimic_agents] >= self.config.error_rate
+                mimicked = np.where(copy_mask, sources, states[mimic_runs, mimic_agents])
+                next_states[mimic_runs, mimic_agents] = mimicked
+                next_scores[mimic_runs, mimic_agents] = self._scores(mimicked)
+
+        search_runs, search_agents = np.nonzero(~mimic)
+        if search_runs.size:
+            picks = (choice_draws[search_runs, search_agents] * self._space_size[search_agents]).astype(
+                np.intp
+            )
+            bits = self._space[search_agents, picks]
+            candidates = states[search_runs, search_agents]
+            candidates[np.arange(search_runs.size), bits] ^= 1
+            candidate_scores = self._scores(candidates)
+            current = scores[search_runs, search_agents]
+            if self.config.accept_equal:
+                accept = candidate_scores >= current
+            else:
+                accept = candidate_scores > current
+            next_states[search_runs[accept], search_agents[accept]] = candidates[accept]
+            next_scores[search_runs[accept], search_agents[accept]] = candidate_scores[accept]
+        return next_states, next_scores
+
+
+def _ranks(sizes: np.ndarray) -> np.ndarray:
+    """0..size-1 for each segment, concatenated (e.g. [2, 3] -> [0, 1, 0, 1, 2])."""
+
+    offsets = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.arange(int(sizes.sum()), dtype=np.intp) - offsets
@@ -185,17 +185,15 @@ def plot_landscape_heatmap(
 
     x_levels = 2 ** len(x_bits)
     y_levels = 2 ** len(y_bits)
-    heatmap = np.zeros((y_levels, x_levels))
-
-    base = baseline_state.astype(np.int8)
-    for xi in range(x_levels):
-        for yi in range(y_levels):
-            state = base.copy()
-            for idx, bit in enumerate(x_bits):
-                state[bit] = (xi >> idx) & 1
-            for idx, bit in enumerate(y_bits):
-                state[bit] = (yi >> idx) & 1
-            heatmap[yi, xi] = landscape.evaluate(state)
+
+    # 断面上の全状態を (y_levels * x_levels, N) 行列にまとめて一括評価する
+    yi, xi = np.divmod(np.arange(y_levels * x_levels), x_levels)
+    states = np.repeat(baseline_state.astype(np.int8)[np.newaxis, :], yi.size, axis=0)
+    for idx, bit in enumerate(x_bits):
+        states[:, bit] = (xi >> idx) & 1
+    for idx, bit in enumerate(y_bits):
+        states[:, bit] = (yi >> idx) & 1
+    heatmap = landscape.evaluate_many(states).reshape(y_levels, x_levels)
 
     x_labels = [format(i, f"0{len(x_bits)}b") for i in range(x_levels)]
     y_labels = [format(i, f"0{len(y_bits)}b") for i in range(y_levels)]